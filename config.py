@@ -6,10 +6,11 @@ SystemPaperDaily - 配置与环境管理
 - 关键词 / RSS 源 / arXiv 分类等全局配置
 """
 
+import functools
 import os
 import logging
 from pathlib import Path
-from dotenv import load_dotenv
+from typing import Final
 
 logger = logging.getLogger(__name__)
 
@@ -17,33 +18,45 @@ logger = logging.getLogger(__name__)
 #  1. 本地代理检测逻辑 (必须在最早阶段执行)
 # ──────────────────────────────────────────────
 
-_project_root = Path(__file__).resolve().parent
-_dotenv_path = _project_root / ".env"
 
-# 判断是否处于本地开发环境：
-#   条件 1: 项目根目录存在 .env 文件
-#   条件 2: 环境变量 LOCAL_DEV 被显式设为 "true"
-_is_local_dev = _dotenv_path.exists() or os.getenv("LOCAL_DEV", "").lower() == "true"
+@functools.cache
+def _load_local_env() -> bool:
+    """定位项目根目录下的 .env 并加载（不覆盖已有环境变量），返回文件是否存在。"""
+    dotenv_path = Path(__file__).resolve().parent / ".env"
+    if not dotenv_path.exists():
+        return False
+    # 仅在确有 .env 时才导入 python-dotenv，CI 上不付出这部分导入开销
+    from dotenv import load_dotenv
 
-if _is_local_dev:
-    # 加载 .env 文件（如果存在），不覆盖已有环境变量
-    load_dotenv(dotenv_path=_dotenv_path, override=False)
+    load_dotenv(dotenv_path=dotenv_path, override=False)
+    return True
+
+
+# 判断是否处于本地开发环境 (先检查廉价的环境变量，CI 上不做任何路径解析 / stat)：
+#   条件 1: 环境变量 LOCAL_DEV 被显式设为 "true"
+#   条件 2: 未设置 CI 环境变量，且项目根目录存在 .env 文件
+if os.getenv("LOCAL_DEV", "").lower() == "true":
+    _load_local_env()
+    _is_local_dev = True
+elif os.getenv("CI") is None:
+    _is_local_dev = _load_local_env()
+else:
+    _is_local_dev = False
 
+# 环境变量快照：进程生命周期内不会变化，统一在此读取一次，后续只读模块常量
+_ENV: Final[dict[str, str]] = os.environ.copy()
+
+if _is_local_dev:
     # 代理地址：优先使用 .env / 环境变量中自定义的值，否则使用默认值
     _default_proxy = "http://127.0.0.1:7890"
-    _proxy = os.getenv("PROXY_URL", _default_proxy)
+    _proxy = _ENV.get("PROXY_URL", _default_proxy)
 
     # 仅在尚未设置代理时自动注入
-    if not os.environ.get("http_proxy"):
-        os.environ["http_proxy"] = _proxy
-        logger.info("[config] 本地开发模式 - 已设置 http_proxy  = %s", _proxy)
-    if not os.environ.get("https_proxy"):
-        os.environ["https_proxy"] = _proxy
-        logger.info("[config] 本地开发模式 - 已设置 https_proxy = %s", _proxy)
-    if not os.environ.get("HTTP_PROXY"):
-        os.environ["HTTP_PROXY"] = _proxy
-    if not os.environ.get("HTTPS_PROXY"):
-        os.environ["HTTPS_PROXY"] = _proxy
+    for _var in ("http_proxy", "https_proxy", "HTTP_PROXY", "HTTPS_PROXY"):
+        if not _ENV.get(_var):
+            os.environ[_var] = _proxy
+            if _var.islower():
+                logger.info("[config] 本地开发模式 - 已设置 %-11s = %s", _var, _proxy)
 else:
     # CI / 服务器环境：仅加载已存在的环境变量
     logger.info("[config] 检测到 CI/服务器环境，跳过代理设置")
@@ -53,38 +66,49 @@ else:
 #  2. 核心密钥 / Token
 # ──────────────────────────────────────────────
 
-GITHUB_TOKEN: str = os.getenv("GITHUB_TOKEN", "")
-WEBHOOK_URL: str = os.getenv("WEBHOOK_URL", "")            # Discord / Slack Webhook
-GITHUB_REPOSITORY: str = os.getenv("GITHUB_REPOSITORY", "")  # owner/repo 格式
+GITHUB_TOKEN: Final[str] = _ENV.get("GITHUB_TOKEN", "")
+WEBHOOK_URL: Final[str] = _ENV.get("WEBHOOK_URL", "")            # Discord / Slack Webhook
+GITHUB_REPOSITORY: Final[str] = _ENV.get("GITHUB_REPOSITORY", "")  # owner/repo 格式
 
 # ──────────────────────────────────────────────
 #  2.2 QQ 邮箱邮件日报配置
 # ──────────────────────────────────────────────
 
-EMAIL_ENABLED: bool = os.getenv("EMAIL_ENABLED", "false").lower() == "true"
-QQ_MAIL_USER: str = os.getenv("QQ_MAIL_USER", "")  # QQ 邮箱发件人地址
-QQ_MAIL_AUTH_CODE: str = os.getenv("QQ_MAIL_AUTH_CODE", "")  # QQ 邮箱授权码
-QQ_MAIL_TO: str = os.getenv("QQ_MAIL_TO", "")  # 收件人邮箱
+EMAIL_ENABLED: Final[bool] = _ENV.get("EMAIL_ENABLED", "false").lower() == "true"
+QQ_MAIL_USER: Final[str] = _ENV.get("QQ_MAIL_USER", "")  # QQ 邮箱发件人地址
+QQ_MAIL_AUTH_CODE: Final[str] = _ENV.get("QQ_MAIL_AUTH_CODE", "")  # QQ 邮箱授权码
+QQ_MAIL_TO: Final[str] = _ENV.get("QQ_MAIL_TO", "")  # 收件人邮箱
 
 # ──────────────────────────────────────────────
 #  2.1 LLM 提供商选择 (gemini / deepseek / openai)
 # ──────────────────────────────────────────────
 
-LLM_PROVIDER: str = os.getenv("LLM_PROVIDER", "deepseek").lower()  # gemini / deepseek / openai
+LLM_PROVIDER: Final[str] = _ENV.get("LLM_PROVIDER", "deepseek").lower()  # gemini / deepseek / openai
+
+# 备用提供商 (逗号分隔，例如 "openai,gemini")：主提供商限流 / 不可用时按顺序切换
+LLM_FALLBACK_PROVIDERS: Final[tuple[str, ...]] = tuple(
+    name.strip().lower()
+    for name in _ENV.get("LLM_FALLBACK_PROVIDERS", "").split(",")
+    if name.strip()
+)
+# 实际尝试顺序：主提供商在前，去重后接备用提供商
+LLM_PROVIDER_CHAIN: Final[tuple[str, ...]] = tuple(
+    dict.fromkeys((LLM_PROVIDER, *LLM_FALLBACK_PROVIDERS))
+)
 
 # Gemini 配置
-GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY", "")
-GEMINI_MODEL: str = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+GEMINI_API_KEY: Final[str] = _ENV.get("GEMINI_API_KEY", "")
+GEMINI_MODEL: Final[str] = _ENV.get("GEMINI_MODEL", "gemini-2.5-flash")
 
 # DeepSeek 配置
-DEEPSEEK_API_KEY: str = os.getenv("DEEPSEEK_API_KEY", "")
-DEEPSEEK_BASE_URL: str = os.getenv("DEEPSEEK_BASE_URL", "https://api.deepseek.com")
-DEEPSEEK_MODEL: str = os.getenv("DEEPSEEK_MODEL", "deepseek-chat")
+DEEPSEEK_API_KEY: Final[str] = _ENV.get("DEEPSEEK_API_KEY", "")
+DEEPSEEK_BASE_URL: Final[str] = _ENV.get("DEEPSEEK_BASE_URL", "https://api.deepseek.com")
+DEEPSEEK_MODEL: Final[str] = _ENV.get("DEEPSEEK_MODEL", "deepseek-chat")
 
 # OpenAI / ChatGPT 配置
-OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
-OPENAI_BASE_URL: str = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
-OPENAI_MODEL: str = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+OPENAI_API_KEY: Final[str] = _ENV.get("OPENAI_API_KEY", "")
+OPENAI_BASE_URL: Final[str] = _ENV.get("OPENAI_BASE_URL", "https://api.openai.com/v1")
+OPENAI_MODEL: Final[str] = _ENV.get("OPENAI_MODEL", "gpt-4o-mini")
 
 TEMPERATURE: float = 1.0
 
@@ -92,11 +116,11 @@ TEMPERATURE: float = 1.0
 #  3. arXiv 查询分类
 # ──────────────────────────────────────────────
 
-ARXIV_CATEGORIES: list[str] = [
+ARXIV_CATEGORIES: tuple[str, ...] = (
     "cs.OS",   # Operating Systems
     "cs.DC",   # Distributed, Parallel, and Cluster Computing
     "cs.NI",   # Networking and Internet Architecture
-]
+)
 
 # 每个分类最大获取论文数
 ARXIV_MAX_RESULTS: int = 30
@@ -108,18 +132,18 @@ ARXIV_RECENT_HOURS: int = 48
 #  4. RSS 源 (USENIX / 会议)
 # ──────────────────────────────────────────────
 
-RSS_FEEDS: list[str] = [
+RSS_FEEDS: tuple[str, ...] = (
     # USENIX OSDI
     "https://www.usenix.org/blog/feed",
     # 可按需添加更多 RSS 源：
     # "https://dl.acm.org/action/showFeed?...",
-]
+)
 
 # ──────────────────────────────────────────────
 #  5. 论文过滤关键词
 # ──────────────────────────────────────────────
 
-KEYWORDS: list[str] = [
+KEYWORDS: frozenset[str] = frozenset({
     "distributed systems",
     "operating systems",
     "consensus",
@@ -136,7 +160,7 @@ KEYWORDS: list[str] = [
     "serverless",
     "disaggregated memory",
     "CXL",
-]
+})
 
 # ──────────────────────────────────────────────
 #  6. PDF 内容提取配置
@@ -147,6 +171,8 @@ PDF_FIRST_N_PAGES: int = 3        # 提取前 N 页 (摘要 + 引言, partial 
 PDF_LAST_N_PAGES: int = 1         # 提取最后 N 页 (结论, partial 模式)
 PDF_TIMEOUT: int = 30              # PDF 下载超时 (秒)
 PDF_MAX_CHARS: int = 50000         # 提取内容最大字符数 (全文模式下需要更大)
+PDF_WORKERS: int = 4               # 并发下载 / 解析 PDF 的线程数
+PDF_MAX_BYTES: int = 50 * 1024 * 1024  # 单个 PDF 下载上限 (字节)，超出则放弃该论文
 
 # ──────────────────────────────────────────────
 #  7. LLM 重试配置
@@ -154,22 +180,48 @@ PDF_MAX_CHARS: int = 50000         # 提取内容最大字符数 (全文模式
 
 LLM_MAX_RETRIES: int = 3          # 最大重试次数
 LLM_RETRY_BASE_DELAY: int = 30    # 首次重试等待秒数 (指数退避基数)
+LLM_RETRY_DEADLINE: int = 300     # 单篇总结累计重试等待上限 (秒)，超出则放弃
+LLM_PROVIDER_COOLDOWN: int = 600  # 提供商因限流 / 超时 / 连接失败放弃后的冷却时间 (秒)，期间直接使用备用提供商
 
 # LLM 输出 token 限制 (影响总结详细程度)
 GEMINI_MAX_OUTPUT_TOKENS: int = 3072   # Gemini 输出限制 (~2000 字)
 DEEPSEEK_MAX_TOKENS: int = 3000        # DeepSeek 输出限制 (~2000 字)
 OPENAI_MAX_TOKENS: int = 3000          # OpenAI 输出限制 (~2000 字)
 
+# Gemini 显式上下文缓存 (context caching) 的有效期 (秒)；系统提示词只在创建缓存时计费一次
+GEMINI_CONTEXT_CACHE_TTL: int = 3600
+
+# 同时进行的 LLM 请求数 (请求起始间隔仍受 REQUEST_SLEEP 约束)
+LLM_CONCURRENCY: int = 4
+
+# 待总结文本少于该字符数时不调用 LLM，直接原样输出 (例如极短的 RSS 摘要)
+MIN_SUMMARY_CHARS: int = 200
+
 # ──────────────────────────────────────────────
 #  8. 杂项
 # ──────────────────────────────────────────────
 
-# 请求间隔 (秒)，避免 API Rate Limit
+# 相邻两次 LLM 请求的最小起始间隔 (秒)，避免 API Rate Limit
 REQUEST_SLEEP: int = 20
 
 # GitHub Issue 标签
 ISSUE_LABEL_DAILY: str = "daily-paper"
 
+# ──────────────────────────────────────────────
+#  9. 本地缓存 (CI 中由 actions/cache 跨运行保存)
+# ──────────────────────────────────────────────
+
+CACHE_DIR: str = ".cache"
+PROCESSED_DB_FILE: str = "processed.sqlite"  # 已处理 paper_id → Issue 编号 / 归档时间
+PROCESSED_RESYNC_DAYS: int = 7               # 距上次全量同步超过该天数时重新全量拉取 Issue 对账
+PDF_CACHE_SUBDIR: str = "pdf_text"           # PDF 提取结果缓存 (CACHE_DIR 下的子目录)
+PDF_CACHE_MAX_ENTRIES: int = 200             # PDF 提取结果最多保留的条目数 (按最近使用淘汰)
+EMAIL_HTML_CACHE_SUBDIR: str = "email_html"  # 邮件 Markdown → HTML 渲染结果缓存
+EMAIL_HTML_CACHE_MAX_ENTRIES: int = 30       # 邮件渲染结果最多保留的条目数 (按最近使用淘汰)
+RSS_STATE_FILE: str = "rss_state.json"       # 各 RSS Feed 的 ETag / Last-Modified，用于条件请求
+LLM_CACHE_FILE: str = "summaries.sqlite"     # LLM 总结缓存 (按模型 + 提示词哈希精确匹配)
+LLM_CACHE_TTL_DAYS: int = 30                 # LLM 总结缓存有效期 (天)
+
 
 def validate() -> bool:
     """检查必要配置是否齐全，返回 True 表示通过。"""
@@ -191,6 +243,15 @@ def validate() -> bool:
     else:
         logger.error("[config] LLM_PROVIDER 必须为 'gemini'、'deepseek' 或 'openai'，当前值: %s", LLM_PROVIDER)
         ok = False
+
+    # 备用提供商：名称必须合法；缺少 API Key 的会在运行时被跳过
+    fallback_keys = {"gemini": GEMINI_API_KEY, "deepseek": DEEPSEEK_API_KEY, "openai": OPENAI_API_KEY}
+    for name in LLM_FALLBACK_PROVIDERS:
+        if name not in fallback_keys:
+            logger.error("[config] LLM_FALLBACK_PROVIDERS 包含未知提供商: %s", name)
+            ok = False
+        elif not fallback_keys[name]:
+            logger.warning("[config] 备用提供商 %s 缺少 API Key，将被跳过", name)
     
     if not GITHUB_TOKEN:
         logger.error("[config] 缺少 GITHUB_TOKEN")
@@ -4,9 +4,9 @@ SystemPaperDaily — 主编排入口
 流程:
   1. 初始化数据源 (arXiv + RSS)
   2. 抓取论文列表
-  3. 关键词过滤
-  4. 去重检查 (GitHub Issues)
-  5. 调用 Gemini 生成总结
+  3. 去重检查 (GitHub Issues)
+  4. 关键词过滤
+  5. 并发提取 PDF 内容，同时调用 LLM 生成总结
   6. 推送通知 (Discord/Slack)
   7. 归档到 GitHub Issues
 """
@@ -14,8 +14,8 @@ SystemPaperDaily — 主编排入口
 from __future__ import annotations
 
 import logging
+import signal
 import sys
-import time
 
 # ── 日志配置 (在导入 config 之前设置，以捕获 config 的代理日志) ──
 logging.basicConfig(
@@ -31,9 +31,9 @@ from src.sources.arxiv_source import ArxivSource
 from src.sources.rss_source import RSSSource
 from src.sources.base import Paper
 from src.deduplicator import Deduplicator
-from src.summarizer import summarize
+from src.summarizer import summarize_batch, warmup
 from src.notifier import notify_daily_digest, notify_daily_summary, send_email_digest
-from src.pdf_extractor import extract_paper_content
+from src.pdf_extractor import extract_many, is_garbled
 
 
 def run() -> None:
@@ -57,8 +57,15 @@ def run() -> None:
     ]
 
     # 只在配置了 RSS 源时添加
-    if config.RSS_FEEDS:
-        sources.append(RSSSource(feed_urls=config.RSS_FEEDS))
+    rss_source = RSSSource(feed_urls=config.RSS_FEEDS) if config.RSS_FEEDS else None
+    if rss_source is not None:
+        sources.append(rss_source)
+
+    def save_feed_state() -> None:
+        # RSS 的 ETag / Last-Modified 只在本次条目全部归档后保存，
+        # 否则下次运行会得到 304 而永久丢失未归档的条目
+        if rss_source is not None:
+            rss_source.save_feed_state()
 
     # ── 2. 抓取论文 ──────────────────────────────
     all_papers: list[Paper] = []
@@ -72,73 +79,78 @@ def run() -> None:
 
     logger.info("共抓取到 %d 篇原始论文", len(all_papers))
 
-    # ── 3. 关键词过滤 ────────────────────────────
-    filtered: list[Paper] = [p for p in all_papers if p.match_keywords(config.KEYWORDS)]
-    logger.info("关键词过滤后: %d 篇", len(filtered))
-
-    if not filtered:
-        logger.info("今日无匹配论文，流程结束。")
-        notify_daily_summary(total=len(all_papers), processed=0, skipped=0)
-        return
-
-    # ── 4. 初始化去重器 ──────────────────────────
+    # ── 3. 初始化去重器 ──────────────────────────
     dedup = Deduplicator()
+    processed_ids = dedup.processed_ids
 
-    # ── 5. 逐篇处理: 去重 + 总结 ────────────────
+    # ── 4. 去重 + 关键词过滤 ─────────────────────
+    # 先做 O(1) 的去重查询，已处理的论文不再进行关键词扫描
     processed_count = 0
     skipped_count = 0
-    # 收集今日新论文 (paper, summary) 用于批量推送
-    daily_results: list[tuple[Paper, str]] = []
-
-    for i, paper in enumerate(filtered):
-        logger.info(
-            "[%d/%d] 处理: %s (%s)",
-            i + 1, len(filtered), paper.title[:60], paper.paper_id,
-        )
-
-        # 5a. 去重检查
-        if dedup.is_paper_processed(paper.paper_id):
-            logger.info("  → 已存在，跳过")
+    new_papers: list[Paper] = []
+    for paper in all_papers:
+        if paper.paper_id in processed_ids or not processed_ids.isdisjoint(paper.legacy_ids):
             skipped_count += 1
-            continue
-
-        # 5b. 提取 PDF 内容 (前3页 + 最后1页)
-        logger.info("  → 提取 PDF 内容...")
-        pdf_content = extract_paper_content(paper)
-        
-        # 如果 PDF 提取失败，使用摘要作为后备
-        content_for_summary = pdf_content if pdf_content else paper.abstract
-        
-        # 5c. 调用 LLM 总结
-        logger.info("  → 生成 AI 总结...")
-        summary = summarize(content_for_summary)
+        elif paper.match_keywords(config.KEYWORDS):
+            new_papers.append(paper)
+    logger.info("去重 + 关键词过滤后待处理: %d 篇 (跳过重复 %d 篇)", len(new_papers), skipped_count)
+
+    if not new_papers:
+        logger.info("今日无匹配的新论文，流程结束。")
+        save_feed_state()
+        notify_daily_summary(total=len(all_papers), processed=0, skipped=skipped_count)
+        return
 
-        # 5c. 追加到今日 Daily Issue
+    # ── 5. PDF 提取 + 总结 ──────────────────────
+    # 两级流水线: PDF 下载/解析在线程池中提前并发进行，每篇提取完成即提交给
+    # LLM 线程池并发总结 (请求起始间隔由 REQUEST_SLEEP 限制)。
+    # 提取第一篇 PDF 的同时在后台预热 LLM 连接
+    warmup()
+
+    def contents_for_summary():
+        for i, (paper, pdf_content) in enumerate(extract_many(new_papers)):
+            logger.info(
+                "[%d/%d] 提交总结: %s (%s)",
+                i + 1, len(new_papers), paper.title[:60], paper.paper_id,
+            )
+            # 如果 PDF 提取失败或提取结果为乱码，使用摘要作为后备
+            if pdf_content and is_garbled(pdf_content):
+                logger.warning("  PDF 提取结果为乱码，改用摘要: %s", paper.paper_id)
+                pdf_content = None
+            yield pdf_content if pdf_content else paper.abstract
+
+    summaries = summarize_batch(contents_for_summary())
+
+    # 按原顺序追加到今日 Daily Issue (内存中，流程结束时统一写入)，
+    # 并收集今日新论文 (paper, summary) 用于批量推送
+    daily_results: list[tuple[Paper, str]] = []
+    for paper, summary in zip(new_papers, summaries):
         issue_num = dedup.append_paper(paper, summary, index=processed_count + 1)
         if issue_num:
-            logger.info("  → 已追加到 Daily Issue #%d", issue_num)
+            logger.info("  → 已追加到 Daily Issue #%d: %s", issue_num, paper.title[:60])
             processed_count += 1
             daily_results.append((paper, summary))
         else:
-            logger.warning("  → Issue 追加失败，但流程继续")
-
-        # 5d. Rate Limit 保护
-        if i < len(filtered) - 1:
-            logger.debug("  → 等待 %d 秒...", config.REQUEST_SLEEP)
-            time.sleep(config.REQUEST_SLEEP)
-
-    # ── 6. 更新今日 Issue 头部统计 ───────────────
-    dedup.update_daily_header(
-        total=len(all_papers),
-        processed=processed_count,
-        skipped=skipped_count,
-    )
+            logger.warning("  → Issue 追加失败，但流程继续: %s", paper.title[:60])
+
+    # ── 6. 更新今日 Issue 头部统计并一次性写入 ───
+    # 没有新论文时跳过，避免无意义的 GitHub 写入
+    if processed_count > 0:
+        dedup.update_daily_header(
+            total=len(all_papers),
+            processed=processed_count,
+            skipped=skipped_count,
+        )
+        if not dedup.flush():
+            logger.warning("今日 Issue 写入失败，本次新论文未归档")
+        elif processed_count == len(new_papers) and not dedup.dropped_ids:
+            save_feed_state()
 
     # ── 7. 推送每日汇总 ──────────────────────────
     logger.info("=" * 60)
     logger.info(
-        "运行结束: 总计 %d 篇, 新处理 %d 篇, 跳过 %d 篇",
-        len(filtered), processed_count, skipped_count,
+        "运行结束: 抓取 %d 篇, 新处理 %d 篇, 跳过 %d 篇",
+        len(all_papers), processed_count, skipped_count,
     )
     logger.info("=" * 60)
 
@@ -157,5 +169,12 @@ def run() -> None:
     )
 
 
+def _handle_sigterm(signum, frame) -> None:
+    """把 SIGTERM (例如 CI 超时取消) 转为 SystemExit，使 finally / atexit 清理逻辑得以执行。"""
+    logger.warning("收到 SIGTERM，正在退出...")
+    sys.exit(128 + signum)
+
+
 if __name__ == "__main__":
+    signal.signal(signal.SIGTERM, _handle_sigterm)
     run()
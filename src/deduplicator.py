@@ -7,23 +7,62 @@
   - Labels: daily-paper
 
 去重逻辑: 在所有 daily-paper Issue 的 body 中搜索 paper_id。
+已处理 ID 缓存在本地 sqlite (config.CACHE_DIR)，每次运行只增量拉取上次同步后更新过的 Issue，
+每隔 config.PROCESSED_RESYNC_DAYS 天全量拉取一次与 GitHub 对账。
 """
 
 from __future__ import annotations
 
 import logging
-from datetime import datetime, timezone
+import re
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
 from typing import Optional
 
+import requests
 from github import Github, GithubException
 from github.Issue import Issue
 from github.Repository import Repository
 
+try:
+    import orjson  # 可选：更快地解析体积较大的 Issue body JSON
+except ImportError:
+    orjson = None
+
 import config
 from src.sources.base import Paper
 
 logger = logging.getLogger(__name__)
 
+_GRAPHQL_URL = "https://api.github.com/graphql"
+
+# 格式: - **Paper ID**: `2301.12345`
+_PAPER_ID_RE = re.compile(r"\*\*Paper ID\*\*:\s*`([^`]+)`")
+
+# GitHub Issue body 有 65536 字符限制，留出余量给截断提示
+_ISSUE_BODY_LIMIT = 65000
+_TRUNCATED_NOTICE = "\n\n> ⚠️ 已达 Issue 长度上限，后续论文请查看下一个 Issue。"
+
+# 头部与论文内容之间的分隔标记；旧 Issue 没有该标记时退回按第一个 --- 拆分
+_PAPERS_MARKER = "---\n<!-- PAPERS_BELOW -->\n\n"
+_LEGACY_SEPARATOR = "---\n\n"
+
+# 一次取 100 个 Issue (GraphQL 上限)，body 随列表一并返回
+_DAILY_ISSUES_QUERY = """
+query($owner: String!, $name: String!, $label: String!, $since: DateTime, $cursor: String) {
+  repository(owner: $owner, name: $name) {
+    issues(
+      labels: [$label], states: [OPEN, CLOSED], filterBy: {since: $since},
+      first: 100, after: $cursor
+    ) {
+      nodes { number title body }
+      pageInfo { hasNextPage endCursor }
+    }
+  }
+}
+"""
+
 
 def _format_paper_section(paper: Paper, summary: str, index: int) -> str:
     """将单篇论文格式化为 Markdown 区块，用于拼接到 Daily Issue body。"""
@@ -31,10 +70,10 @@ def _format_paper_section(paper: Paper, summary: str, index: int) -> str:
         f"## {index}. {paper.title}",
         "",
         f"- **Paper ID**: `{paper.paper_id}`",
-        f"- **Authors**: {', '.join(paper.authors) if paper.authors else 'N/A'}",
+        f"- **Authors**: {paper.authors_str or 'N/A'}",
         f"- **Published**: {paper.published or 'N/A'}",
         f"- **Source**: {paper.source}",
-        f"- **Categories**: {', '.join(paper.categories) if paper.categories else 'N/A'}",
+        f"- **Categories**: {paper.categories_str or 'N/A'}",
         f"- **PDF**: {paper.pdf_url}",
         f"- **URL**: {paper.html_url}",
         "",
@@ -59,9 +98,29 @@ class Deduplicator:
 
     def __init__(self):
         self._gh = Github(config.GITHUB_TOKEN)
+        # 直接调用 GitHub API (GraphQL) 时复用同一个 keep-alive 连接
+        self._http = requests.Session()
+        self._http.headers["Authorization"] = f"bearer {config.GITHUB_TOKEN}"
+        # 本次运行的时间快照：日期 / 标题在整个运行中保持一致 (即使跨过 UTC 零点)
+        self._run_started = datetime.now(timezone.utc)
+        self._run_date_str = self._run_started.strftime("%Y-%m-%d")
+        self._run_title = f"[Daily] {self._run_date_str} SystemPaperDaily"
         self._repo: Optional[Repository] = None
         self._today_issue: Optional[Issue] = None
+        # 今日 Issue body 拆分为头部 + 论文区块，追加时只做一次 join
+        self._today_header: str = ""
+        self._today_sections: list[str] = []
+        # 已追加但尚未 flush 到 GitHub 的 paper_id
+        self._pending_ids: list[str] = []
+        # 因 Issue 长度上限未能写入的 paper_id (不持久化，下次运行重试)
+        self.dropped_ids: list[str] = []
         self._processed_ids_cache: Optional[set[str]] = None
+        # 拉取 Issue 时顺带记录 title → number，用于查找今日 Issue
+        self._issue_index: dict[str, int] = {}
+        # GraphQL 拉取成功后索引覆盖上次同步后更新过的全部 Issue，无需再走 REST 查找
+        self._issue_index_synced = False
+        self._cache_dir = Path(config.CACHE_DIR)
+        self._db_conn: Optional[sqlite3.Connection] = None
 
     @property
     def repo(self) -> Repository:
@@ -70,13 +129,6 @@ class Deduplicator:
             logger.info("[Deduplicator] 已连接仓库: %s", config.GITHUB_REPOSITORY)
         return self._repo
 
-    # ── 日期标题 ────────────────────────────────
-    @staticmethod
-    def _daily_title(date: Optional[datetime] = None) -> str:
-        """生成当日 Issue 标题。"""
-        d = date or datetime.now(timezone.utc)
-        return f"[Daily] {d.strftime('%Y-%m-%d')} SystemPaperDaily"
-
     # ── 确保标签存在 ────────────────────────────
     def _ensure_label(self, name: str, color: str = "0075ca") -> None:
         """如果标签不存在则创建。"""
@@ -89,38 +141,168 @@ class Deduplicator:
             except GithubException as e:
                 logger.warning("[Deduplicator] 创建标签失败 (%s): %s", name, e)
 
+    # ── GraphQL 批量拉取 ────────────────────────
+    def _fetch_daily_issues(self, since: Optional[str] = None) -> list[dict]:
+        """
+        通过 GraphQL 分页拉取 daily-paper Issue (number / title / body)。
+
+        每页 100 个，N 个 Issue 只需 ⌈N/100⌉ 次请求。
+        指定 since (ISO 时间) 时只返回该时间之后有更新的 Issue。
+        """
+        owner, _, name = config.GITHUB_REPOSITORY.partition("/")
+        variables = {
+            "owner": owner,
+            "name": name,
+            "label": config.ISSUE_LABEL_DAILY,
+            "since": since,
+            "cursor": None,
+        }
+        nodes: list[dict] = []
+        while True:
+            resp = self._http.post(
+                _GRAPHQL_URL,
+                json={"query": _DAILY_ISSUES_QUERY, "variables": variables},
+                timeout=30,
+            )
+            resp.raise_for_status()
+            payload = orjson.loads(resp.content) if orjson is not None else resp.json()
+            if payload.get("errors"):
+                raise GithubException(resp.status_code, payload, dict(resp.headers))
+
+            # 仓库不存在或无权访问时 repository 为 null 且不一定带 errors
+            repository = (payload.get("data") or {}).get("repository")
+            if repository is None:
+                raise GithubException(resp.status_code, payload, dict(resp.headers))
+
+            issues = repository["issues"]
+            nodes.extend(issues["nodes"])
+            if not issues["pageInfo"]["hasNextPage"]:
+                return nodes
+            variables["cursor"] = issues["pageInfo"]["endCursor"]
+
+    # ── 本地 ID 缓存 (sqlite) ───────────────────
+    def _db(self) -> Optional[sqlite3.Connection]:
+        """打开 (必要时创建) 本地 sqlite 缓存，失败时返回 None 并退回纯 GitHub 模式。"""
+        if self._db_conn is not None:
+            return self._db_conn
+        try:
+            self._cache_dir.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self._cache_dir / config.PROCESSED_DB_FILE)
+            conn.executescript(
+                "CREATE TABLE IF NOT EXISTS papers("
+                "paper_id TEXT PRIMARY KEY, issue INTEGER, ts INTEGER);"
+                "CREATE TABLE IF NOT EXISTS meta(key TEXT PRIMARY KEY, value TEXT);"
+            )
+        except (OSError, sqlite3.Error) as e:
+            logger.warning("[Deduplicator] 打开本地 ID 缓存失败: %s", e)
+            return None
+        self._db_conn = conn
+        return conn
+
+    def _read_id_cache(self) -> tuple[set[str], Optional[str]]:
+        """
+        读取本地缓存的已处理 ID 及上次同步时间。
+
+        缓存为空或距上次全量同步超过 PROCESSED_RESYNC_DAYS 天时返回 since=None，触发全量拉取。
+        """
+        conn = self._db()
+        if conn is None:
+            return set(), None
+        try:
+            ids = {row[0] for row in conn.execute("SELECT paper_id FROM papers")}
+            meta = dict(conn.execute("SELECT key, value FROM meta"))
+        except sqlite3.Error as e:
+            logger.warning("[Deduplicator] 读取本地 ID 缓存失败: %s", e)
+            return set(), None
+
+        since = meta.get("synced_at")
+        full_synced_at = meta.get("full_synced_at")
+        resync_before = self._run_started - timedelta(days=config.PROCESSED_RESYNC_DAYS)
+        if not since or not full_synced_at or full_synced_at < resync_before.strftime("%Y-%m-%dT%H:%M:%SZ"):
+            logger.info("[Deduplicator] 本地缓存需要全量对账，将重新拉取全部 daily Issue")
+            since = None
+        else:
+            logger.info("[Deduplicator] 本地缓存命中 %d 个 paper_id (同步于 %s)", len(ids), since)
+        return ids, since
+
+    def _write_id_cache(self, rows: list[tuple[str, int]], synced_at: str, full: bool) -> None:
+        """
+        将 (paper_id, issue) 写入本地缓存 (已存在则忽略) 并记录同步时间。
+
+        full=True (全量对账) 时先清空旧记录，已删除 / 修改的 Issue 中的 ID 随之移除。
+        """
+        conn = self._db()
+        if conn is None:
+            return
+        ts = int(self._run_started.timestamp())
+        meta = [("synced_at", synced_at)]
+        if full:
+            meta.append(("full_synced_at", synced_at))
+        try:
+            with conn:
+                if full:
+                    conn.execute("DELETE FROM papers")
+                conn.executemany(
+                    "INSERT OR IGNORE INTO papers(paper_id, issue, ts) VALUES (?, ?, ?)",
+                    [(paper_id, issue, ts) for paper_id, issue in rows],
+                )
+                conn.executemany("INSERT OR REPLACE INTO meta(key, value) VALUES (?, ?)", meta)
+        except sqlite3.Error as e:
+            logger.warning("[Deduplicator] 写入本地 ID 缓存失败: %s", e)
+
+    def _append_id_cache(self, paper_ids: list[str], issue: int) -> None:
+        """将新归档的 paper_id 写入本地缓存。"""
+        conn = self._db()
+        if conn is None:
+            return
+        ts = int(datetime.now(timezone.utc).timestamp())
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO papers(paper_id, issue, ts) VALUES (?, ?, ?)",
+                    [(paper_id, issue, ts) for paper_id in paper_ids],
+                )
+        except sqlite3.Error as e:
+            logger.warning("[Deduplicator] 追加本地 ID 缓存失败: %s", e)
+
     # ── 加载已处理的 paper_id 集合 ──────────────
     def _load_processed_ids(self) -> set[str]:
         """
-        遍历所有 daily-paper 标签的 Issue，
-        从 body 中提取 `Paper ID`: `xxx` 来构建已处理 ID 集合。
+        从本地缓存加载已处理 ID，再拉取上次同步后更新过的 daily-paper Issue，
+        从 body 中提取 `Paper ID`: `xxx` 合并进已处理 ID 集合。
         """
         if self._processed_ids_cache is not None:
             return self._processed_ids_cache
 
-        ids: set[str] = set()
+        ids, since = self._read_id_cache()
+        # 以运行开始时间作为下次的同步点，保证本次运行期间的更新不会漏掉
+        sync_started = self._run_started.strftime("%Y-%m-%dT%H:%M:%SZ")
+        rows: list[tuple[str, int]] = []
         try:
-            self._ensure_label(config.ISSUE_LABEL_DAILY)
-            issues = self.repo.get_issues(
-                labels=[self.repo.get_label(config.ISSUE_LABEL_DAILY)],
-                state="all",
-            )
-            for issue in issues:
-                body = issue.body or ""
+            for issue in self._fetch_daily_issues(since=since):
+                self._issue_index[issue["title"].strip()] = issue["number"]
                 # 提取所有 **Paper ID**: `xxx` 模式
-                for line in body.split("\n"):
-                    if "**Paper ID**" in line and "`" in line:
-                        # 格式: - **Paper ID**: `2301.12345`
-                        start = line.index("`") + 1
-                        end = line.index("`", start)
-                        ids.add(line[start:end])
-        except GithubException as e:
+                for paper_id in _PAPER_ID_RE.findall(issue["body"] or ""):
+                    rows.append((paper_id, issue["number"]))
+        except (GithubException, requests.RequestException) as e:
             logger.error("[Deduplicator] 加载已处理 ID 失败: %s", e)
+        else:
+            self._issue_index_synced = True
+            if since is None:
+                # 全量对账成功：以 GitHub 上的 Issue 为准，丢弃本地缓存中的旧 ID
+                ids.clear()
+            self._write_id_cache(rows, sync_started, full=since is None)
+        ids.update(paper_id for paper_id, _ in rows)
 
         logger.info("[Deduplicator] 已加载 %d 个已处理 paper_id", len(ids))
         self._processed_ids_cache = ids
         return ids
 
+    @property
+    def processed_ids(self) -> set[str]:
+        """已出现在 daily Issue 中的 paper_id 集合 (首次访问时加载)。"""
+        return self._load_processed_ids()
+
     # ── 去重查询 ──────────────────────────────
     def is_paper_processed(self, paper_id: str) -> bool:
         """检查 paper_id 是否已出现在任何 daily Issue 中。"""
@@ -130,33 +312,63 @@ class Deduplicator:
             return True
         return False
 
+    # ── 今日 Issue body 拆分 ────────────────────
+    def _set_today_issue(self, issue: Issue) -> None:
+        """记录今日 Issue，并将现有 body 按分隔标记拆分为头部与论文内容。"""
+        self._today_issue = issue
+        body = issue.body or ""
+        for separator in (_PAPERS_MARKER, _LEGACY_SEPARATOR):
+            header, found, papers_content = body.partition(separator)
+            if found:
+                self._today_header = header + separator
+                break
+        else:
+            self._today_header = ""
+            papers_content = body
+        self._today_sections = [papers_content] if papers_content else []
+
+    def _build_today_body(self) -> str:
+        """拼接今日 Issue 的完整 body。"""
+        return self._today_header + "".join(self._today_sections)
+
     # ── 获取或创建今日 Issue ─────────────────────
     def _get_or_create_daily_issue(self) -> Issue:
         """获取今日的 Daily Issue，不存在则创建。"""
         if self._today_issue is not None:
             return self._today_issue
 
-        today_title = self._daily_title()
+        today_title = self._run_title
         self._ensure_label(config.ISSUE_LABEL_DAILY)
 
-        # 搜索今日 Issue
-        query = f'repo:{config.GITHUB_REPOSITORY} in:title "{today_title}"'
+        # 先查已拉取的 Issue 索引；仅当 GraphQL 拉取失败时才通过 REST 列出今日更新过的 daily Issue
+        self._load_processed_ids()
         try:
-            results = self._gh.search_issues(query=query)
-            for issue in results:
-                if issue.title.strip() == today_title:
-                    logger.info("[Deduplicator] 找到今日 Issue #%d", issue.number)
-                    self._today_issue = issue
-                    return issue
+            number = self._issue_index.get(today_title)
+            if number is not None:
+                issue = self.repo.get_issue(number)
+                logger.info("[Deduplicator] 找到今日 Issue #%d", issue.number)
+                self._set_today_issue(issue)
+                return issue
+
+            if not self._issue_index_synced:
+                today_start = self._run_started.replace(hour=0, minute=0, second=0, microsecond=0)
+                for issue in self.repo.get_issues(
+                    state="all",
+                    labels=[config.ISSUE_LABEL_DAILY],
+                    since=today_start,
+                ):
+                    if issue.title.strip() == today_title:
+                        logger.info("[Deduplicator] 找到今日 Issue #%d", issue.number)
+                        self._set_today_issue(issue)
+                        return issue
         except GithubException as e:
-            logger.warning("[Deduplicator] 搜索今日 Issue 失败: %s", e)
+            logger.warning("[Deduplicator] 查找今日 Issue 失败: %s", e)
 
         # 不存在则创建
-        today_str = datetime.now(timezone.utc).strftime("%Y-%m-%d")
         header = (
-            f"# 📚 SystemPaperDaily — {today_str}\n\n"
+            f"# 📚 SystemPaperDaily — {self._run_date_str}\n\n"
             f"> 自动抓取的系统领域 (OSDI/SOSP/EuroSys) 最新论文每日汇总。\n\n"
-            f"---\n\n"
+            + _PAPERS_MARKER
         )
         try:
             issue = self.repo.create_issue(
@@ -165,7 +377,7 @@ class Deduplicator:
                 labels=[config.ISSUE_LABEL_DAILY],
             )
             logger.info("[Deduplicator] 创建今日 Issue #%d: %s", issue.number, today_title)
-            self._today_issue = issue
+            self._set_today_issue(issue)
             return issue
         except GithubException as e:
             logger.error("[Deduplicator] 创建今日 Issue 失败: %s", e, exc_info=True)
@@ -179,7 +391,9 @@ class Deduplicator:
         index: int = 1,
     ) -> Optional[int]:
         """
-        将论文总结追加到今日的 Daily Issue 中。
+        将论文总结追加到今日 Daily Issue 的待写入内容中。
+
+        只修改内存中的 body，实际写入由 flush() 统一完成 (每次运行一次 PATCH)。
 
         Args:
             paper:   论文对象。
@@ -194,59 +408,94 @@ class Deduplicator:
         except Exception:
             return None
 
-        section = _format_paper_section(paper, summary, index)
-        new_body = (issue.body or "") + section
-
-        # GitHub Issue body 有 65536 字符限制
-        if len(new_body) > 65000:
-            logger.warning("[Deduplicator] Issue body 接近长度上限，截断处理")
-            new_body = new_body[:65000] + "\n\n> ⚠️ 已达 Issue 长度上限，后续论文请查看下一个 Issue。"
-
-        try:
-            issue.edit(body=new_body)
-            # 更新缓存
-            if self._processed_ids_cache is not None:
-                self._processed_ids_cache.add(paper.paper_id)
-            logger.info(
-                "[Deduplicator] 论文已追加到 Issue #%d: %s",
-                issue.number, paper.title[:60],
-            )
-            return issue.number
-        except GithubException as e:
-            logger.error("[Deduplicator] 更新 Issue 失败: %s", e, exc_info=True)
-            return None
+        self._today_sections.append(_format_paper_section(paper, summary, index))
+        self._pending_ids.append(paper.paper_id)
+        if self._processed_ids_cache is not None:
+            self._processed_ids_cache.add(paper.paper_id)
+        logger.info(
+            "[Deduplicator] 论文已加入 Issue #%d 待写入内容: %s",
+            issue.number, paper.title[:60],
+        )
+        return issue.number
 
     # ── 更新今日 Issue 头部统计 ─────────────────
     def update_daily_header(self, total: int, processed: int, skipped: int) -> None:
-        """在今日 Issue 顶部追加统计信息。"""
+        """在今日 Issue 顶部追加统计信息 (随 flush() 一并写入)。"""
         if self._today_issue is None:
             return
 
-        today_str = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-        header = (
-            f"# 📚 SystemPaperDaily — {today_str}\n\n"
+        # 替换分隔标记之前的内容为新 header，保留之后的论文内容
+        self._today_header = (
+            f"# 📚 SystemPaperDaily — {self._run_date_str}\n\n"
             f"> 自动抓取的系统领域 (OSDI/SOSP/EuroSys) 最新论文每日汇总。\n\n"
             f"| 指标 | 数量 |\n"
             f"|------|------|\n"
             f"| 抓取总数 | {total} |\n"
             f"| 新处理 | {processed} |\n"
             f"| 跳过 (重复) | {skipped} |\n\n"
-            f"---\n\n"
+            + _PAPERS_MARKER
         )
 
-        body = self._today_issue.body or ""
-        # 替换第一个 --- 之前的内容为新 header
-        separator = "---\n\n"
-        first_sep = body.find(separator)
-        if first_sep != -1:
-            # 保留 --- 之后的论文内容
-            papers_content = body[first_sep + len(separator):]
-            new_body = header + papers_content
-        else:
-            new_body = header + body
+    # ── Issue 长度上限 ──────────────────────────
+    def _fit_today_body(self) -> tuple[str, list[str]]:
+        """
+        拼接今日 Issue body，超出长度上限时整段丢弃放不下的新论文区块。
+
+        Returns:
+            (body, 实际写入 body 的新 paper_id 列表)。被丢弃的 paper_id 记录在
+            self.dropped_ids 中，不写入持久缓存，下次运行会重新处理。
+        """
+        new_count = len(self._pending_ids)
+        old_sections = self._today_sections[:len(self._today_sections) - new_count]
+        new_sections = self._today_sections[len(old_sections):]
+
+        body = self._today_header + "".join(old_sections)
+        truncated = len(body) > _ISSUE_BODY_LIMIT
+        if truncated:
+            body = body[:_ISSUE_BODY_LIMIT]
+
+        archived_ids: list[str] = []
+        for paper_id, section in zip(self._pending_ids, new_sections):
+            if truncated or len(body) + len(section) > _ISSUE_BODY_LIMIT:
+                truncated = True
+                self.dropped_ids.append(paper_id)
+                continue
+            body += section
+            archived_ids.append(paper_id)
+
+        if truncated:
+            logger.warning(
+                "[Deduplicator] Issue body 接近长度上限，%d 篇论文未写入，下次运行重试",
+                len(self.dropped_ids),
+            )
+            if self._processed_ids_cache is not None:
+                self._processed_ids_cache.difference_update(self.dropped_ids)
+            if not body.endswith(_TRUNCATED_NOTICE):
+                body += _TRUNCATED_NOTICE
+        return body, archived_ids
+
+    # ── 写入今日 Issue ──────────────────────────
+    def flush(self) -> bool:
+        """将头部与所有新追加的论文一次性写入今日 Issue，成功后持久化新 paper_id。"""
+        if self._today_issue is None:
+            return True
+
+        new_body, archived_ids = self._fit_today_body()
+
+        if new_body == (self._today_issue.body or ""):
+            logger.info("[Deduplicator] 今日 Issue 内容无变化，跳过写入")
+            return True
 
         try:
             self._today_issue.edit(body=new_body)
-            logger.info("[Deduplicator] 已更新今日 Issue 头部统计")
         except GithubException as e:
-            logger.error("[Deduplicator] 更新头部统计失败: %s", e)
+            logger.error("[Deduplicator] 更新 Issue 失败: %s", e, exc_info=True)
+            return False
+
+        self._append_id_cache(archived_ids, self._today_issue.number)
+        logger.info(
+            "[Deduplicator] 已写入今日 Issue #%d (新增 %d 篇)",
+            self._today_issue.number, len(archived_ids),
+        )
+        self._pending_ids.clear()
+        return True
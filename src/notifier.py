@@ -4,15 +4,21 @@
 
 from __future__ import annotations
 
-import json
+import atexit
+import hashlib
 import logging
+import os
+import re
 import smtplib
+import time
 from datetime import datetime, timezone
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-from typing import List, Tuple
+from email.message import EmailMessage
+from pathlib import Path
+from typing import List, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 import config
 from src.sources.base import Paper
@@ -26,6 +32,35 @@ except ImportError:
     markdown = None
     logger.warning("[Notifier] 未安装 markdown 库，邮件功能将受限")
 
+# 所有 Webhook 推送共用一个 Session：Discord 分批发送时复用同一 keep-alive 连接；
+# 连接失败与网关类 5xx 由 urllib3 自动退避重试
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=frozenset({"POST"}),
+        raise_on_status=False,
+    ),
+))
+
+# 总结中 "核心痛点" 小节的正文：从标题行 (如 "## 🎯 核心痛点 (Problem)") 到下一个 ## 标题之前
+_PAIN_RE = re.compile(r"^##[^\n]*核心痛点[^\n]*\n(.*?)(?=^##\s|\Z)", re.MULTILINE | re.DOTALL)
+
+# Discord embed 颜色: 头部 (绿色) / 单篇论文 (Blurple)
+_DISCORD_HEADER_COLOR = 0x57F287
+_DISCORD_EMBED_COLOR = 0x5865F2
+
+# 429 限流时的最大尝试次数与单次最长等待 (秒)
+_WEBHOOK_MAX_ATTEMPTS = 3
+_WEBHOOK_MAX_DELAY = 60.0
+
+# Discord 告知当前限流桶已耗尽时，下一次推送最早可发出的时间 (time.monotonic)
+_next_post_at = 0.0
+
 
 def _truncate(text: str, max_len: int) -> str:
     """截断文本，保留末尾省略号。"""
@@ -41,28 +76,61 @@ def _detect_platform(url: str) -> str:
     return "slack"
 
 
+def _retry_after(resp: requests.Response) -> float:
+    """从 429 响应中解析需要等待的秒数：优先 Retry-After 头，其次 Discord JSON 中的 retry_after。"""
+    delay = resp.headers.get("Retry-After")
+    if delay is None:
+        try:
+            delay = resp.json().get("retry_after")
+        except ValueError:
+            delay = None
+    try:
+        return min(max(float(delay), 0.0), _WEBHOOK_MAX_DELAY)
+    except (TypeError, ValueError):
+        return 1.0
+
+
 def _post_webhook(payload: dict) -> bool:
-    """发送 Webhook 请求。"""
+    """发送 Webhook 请求，遇到 429 时按服务端给出的等待时间重试。"""
+    global _next_post_at
+
     webhook_url = config.WEBHOOK_URL
     if not webhook_url:
         logger.info("[Notifier] 未配置 WEBHOOK_URL，跳过推送")
         return False
 
-    try:
-        resp = requests.post(
-            webhook_url,
-            data=json.dumps(payload),
-            headers={"Content-Type": "application/json"},
-            timeout=15,
-        )
+    for attempt in range(1, _WEBHOOK_MAX_ATTEMPTS + 1):
+        # 上一次响应显示限流桶已空时，主动等到重置再发，避免直接吃 429
+        wait = _next_post_at - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+
+        try:
+            resp = _SESSION.post(webhook_url, json=payload, timeout=15)
+        except requests.RequestException as e:
+            logger.error("[Notifier] 网络错误: %s", e)
+            return False
+
+        if resp.headers.get("X-RateLimit-Remaining") == "0":
+            try:
+                reset_after = float(resp.headers.get("X-RateLimit-Reset-After", 0))
+            except ValueError:
+                reset_after = 0.0
+            _next_post_at = time.monotonic() + min(reset_after, _WEBHOOK_MAX_DELAY)
+
         if resp.status_code in (200, 204):
             return True
-        else:
-            logger.warning("[Notifier] 推送失败 [%d]: %s", resp.status_code, resp.text[:200])
-            return False
-    except requests.RequestException as e:
-        logger.error("[Notifier] 网络错误: %s", e)
+        if resp.status_code == 429 and attempt < _WEBHOOK_MAX_ATTEMPTS:
+            delay = _retry_after(resp)
+            logger.warning(
+                "[Notifier] 推送被限流 (429)，%.1f 秒后重试 (%d/%d)",
+                delay, attempt, _WEBHOOK_MAX_ATTEMPTS,
+            )
+            time.sleep(delay)
+            continue
+        logger.warning("[Notifier] 推送失败 [%d]: %s", resp.status_code, resp.text[:200])
         return False
+    return False
 
 
 # ── 每日批量汇总推送 ──────────────────────────────
@@ -90,55 +158,48 @@ def notify_daily_digest(results: List[Tuple[Paper, str]]) -> bool:
 
 def _notify_discord_digest(results: List[Tuple[Paper, str]], today: str) -> bool:
     """Discord: 一条主消息 + 每篇论文一个 embed (Discord 限制 10 embeds/msg)。"""
-    # Discord 单消息最多 10 个 embed，按批次发送
-    batch_size = 10
-    success = True
+    embeds = [{
+        "title": f"📚 SystemPaperDaily — {today}",
+        "description": f"今日新增 **{len(results)}** 篇系统领域论文",
+        "color": _DISCORD_HEADER_COLOR,
+    }]
 
-    for batch_start in range(0, len(results), batch_size):
-        batch = results[batch_start: batch_start + batch_size]
-        embeds = []
+    for paper, summary in results:
+        pdf_url = paper.pdf_url
+        categories = paper.categories
+        url = paper.html_url or pdf_url
+
+        # 精简摘要，只取核心痛点部分 (合并为一行)
+        m = _PAIN_RE.search(summary)
+        short_summary = " ".join(m.group(1).split()) if m else ""
+        if not short_summary:
+            short_summary = summary
 
-        # 第一批加一个头部
-        if batch_start == 0:
-            embeds.append({
-                "title": f"📚 SystemPaperDaily — {today}",
-                "description": f"今日新增 **{len(results)}** 篇系统领域论文",
-                "color": 0x57F287,  # Green
-            })
+        fields = []
+        if pdf_url:
+            fields.append({"name": "📄 PDF", "value": pdf_url, "inline": True})
+        if categories:
+            fields.append({"name": "🏷️", "value": ", ".join(categories[:3]), "inline": True})
+        embeds.append({
+            "title": _truncate(paper.title, 256),
+            "url": url,
+            "description": _truncate(short_summary, 1024),
+            "color": _DISCORD_EMBED_COLOR,
+            "fields": fields,
+        })
 
-        for paper, summary in batch:
-            # 精简摘要，只取核心痛点部分
-            short_summary = summary
-            if "## 核心痛点" in summary:
-                lines = summary.split("\n")
-                key_lines = []
-                capture = False
-                for line in lines:
-                    if "核心痛点" in line:
-                        capture = True
-                        continue
-                    if capture and line.startswith("## "):
-                        break
-                    if capture and line.strip():
-                        key_lines.append(line.strip())
-                if key_lines:
-                    short_summary = " ".join(key_lines)
-
-            embed = {
-                "title": _truncate(paper.title, 256),
-                "url": paper.html_url or paper.pdf_url,
-                "description": _truncate(short_summary, 1024),
-                "color": 0x5865F2,
-                "fields": [],
-            }
-            if paper.pdf_url:
-                embed["fields"].append({"name": "📄 PDF", "value": paper.pdf_url, "inline": True})
-            if paper.categories:
-                embed["fields"].append({"name": "🏷️", "value": ", ".join(paper.categories[:3]), "inline": True})
-            embeds.append(embed)
-
-        if not _post_webhook({"embeds": embeds}):
-            success = False
+    # Discord 单消息最多 10 个 embed (含头部)，按批次发送
+    batch_size = 10
+    payloads = [
+        {"embeds": embeds[start: start + batch_size]}
+        for start in range(0, len(embeds), batch_size)
+    ]
+
+    # 按顺序逐批发送，保证消息在频道中的顺序与论文顺序一致；
+    # 429 限流由 _post_webhook 按 retry_after 等待重试
+    success = True
+    for payload in payloads:
+        success = _post_webhook(payload) and success
 
     logger.info("[Notifier] Discord 每日汇总推送完成 (%d 篇)", len(results))
     return success
@@ -158,19 +219,19 @@ def _notify_slack_digest(results: List[Tuple[Paper, str]], today: str) -> bool:
         {"type": "divider"},
     ]
 
-    for paper, summary in results:
+    # Slack blocks 上限 50，超出部分不必构建
+    for paper, summary in results[: 50 - len(blocks)]:
         # 精简为一行概要
-        short = _truncate(summary.split("\n")[0] if summary else "", 200)
+        short = _truncate(summary.partition("\n")[0], 200)
+        url = paper.html_url or paper.pdf_url
         blocks.append({
             "type": "section",
             "text": {
                 "type": "mrkdwn",
-                "text": f"*<{paper.html_url or paper.pdf_url}|{_truncate(paper.title, 120)}>*\n{short}",
+                "text": f"*<{url}|{_truncate(paper.title, 120)}>*\n{short}",
             },
         })
 
-    # Slack blocks 上限 50
-    blocks = blocks[:50]
     ok = _post_webhook({"blocks": blocks})
     logger.info("[Notifier] Slack 每日汇总推送完成 (%d 篇)", len(results))
     return ok
@@ -204,6 +265,70 @@ def notify_daily_summary(total: int, processed: int, skipped: int) -> bool:
 
 # ── QQ 邮箱邮件日报 ───────────────────────────────────
 
+_SMTP_HOST = "smtp.qq.com"
+_SMTP_PORT = 465
+
+
+class _SmtpPool:
+    """
+    复用单个已登录的 SMTP_SSL 连接。
+
+    首次发送时建立连接并登录；空闲超过 idle_timeout 秒后先用 NOOP 探活，
+    连接已失效则重新建立。进程退出时自动关闭。
+    """
+
+    def __init__(self, host: str, port: int, idle_timeout: float = 60.0):
+        self._host = host
+        self._port = port
+        self._idle_timeout = idle_timeout
+        self._server: Optional[smtplib.SMTP_SSL] = None
+        self._last_used = 0.0
+
+    def _connect(self) -> smtplib.SMTP_SSL:
+        logger.info("[Notifier] 正在连接 QQ 邮箱 SMTP 服务器...")
+        server = smtplib.SMTP_SSL(self._host, self._port, timeout=30)
+        try:
+            server.login(config.QQ_MAIL_USER, config.QQ_MAIL_AUTH_CODE)
+        except smtplib.SMTPException:
+            server.close()
+            raise
+        return server
+
+    def _get_server(self) -> smtplib.SMTP_SSL:
+        server = self._server
+        if server is not None and time.monotonic() - self._last_used > self._idle_timeout:
+            try:
+                if server.noop()[0] != 250:
+                    raise smtplib.SMTPServerDisconnected("NOOP failed")
+            except (smtplib.SMTPException, OSError):
+                self.close()
+                server = None
+        if server is None:
+            server = self._server = self._connect()
+        return server
+
+    def send_message(self, msg: EmailMessage) -> None:
+        try:
+            self._get_server().send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            # 复用的连接被服务端断开：重连后重试一次
+            self.close()
+            self._get_server().send_message(msg)
+        self._last_used = time.monotonic()
+
+    def close(self) -> None:
+        server, self._server = self._server, None
+        if server is None:
+            return
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            server.close()
+
+
+_SMTP_POOL = _SmtpPool(_SMTP_HOST, _SMTP_PORT)
+atexit.register(_SMTP_POOL.close)
+
 
 def send_email_digest(results: List[Tuple[Paper, str]]) -> bool:
     """
@@ -240,10 +365,7 @@ def send_email_digest(results: List[Tuple[Paper, str]]) -> bool:
         markdown_content = _build_email_markdown(results, today)
         
         # 转换为 HTML
-        html_content = markdown.markdown(
-            markdown_content,
-            extensions=['extra', 'codehilite', 'nl2br']
-        )
+        html_content = _render_markdown(markdown_content)
         
         # 添加 CSS 样式
         html_body = f"""
@@ -331,25 +453,16 @@ def send_email_digest(results: List[Tuple[Paper, str]]) -> bool:
 </html>
 """
         
-        # 创建邮件对象
-        msg = MIMEMultipart('alternative')
+        # 创建邮件对象: 精简纯文本版本（仅标题 + 链接，作为后备）+ HTML 版本
+        msg = EmailMessage()
         msg['From'] = config.QQ_MAIL_USER
         msg['To'] = config.QQ_MAIL_TO
         msg['Subject'] = subject
+        msg.set_content(_build_email_text(results, today))
+        msg.add_alternative(html_body, subtype='html')
         
-        # 添加纯文本版本（作为后备）
-        text_part = MIMEText(markdown_content, 'plain', 'utf-8')
-        msg.attach(text_part)
-        
-        # 添加 HTML 版本
-        html_part = MIMEText(html_body, 'html', 'utf-8')
-        msg.attach(html_part)
-        
-        # 发送邮件
-        logger.info("[Notifier] 正在连接 QQ 邮箱 SMTP 服务器...")
-        with smtplib.SMTP_SSL('smtp.qq.com', 465, timeout=30) as server:
-            server.login(config.QQ_MAIL_USER, config.QQ_MAIL_AUTH_CODE)
-            server.send_message(msg)
+        # 发送邮件 (复用已登录的 SMTP 连接)
+        _SMTP_POOL.send_message(msg)
         
         logger.info("[Notifier] ✅ 邮件发送成功: %s → %s (%d 篇论文)", 
                     config.QQ_MAIL_USER, config.QQ_MAIL_TO, len(results))
@@ -367,6 +480,58 @@ def send_email_digest(results: List[Tuple[Paper, str]]) -> bool:
         return False
 
 
+def _render_markdown(markdown_content: str) -> str:
+    """
+    将邮件 Markdown 渲染为 HTML。
+
+    渲染结果按内容哈希缓存到 config.CACHE_DIR，重跑 / 重发相同内容时直接读取。
+    """
+    key = hashlib.blake2b(markdown_content.encode("utf-8"), digest_size=16).hexdigest()
+    cache_dir = Path(config.CACHE_DIR) / config.EMAIL_HTML_CACHE_SUBDIR
+    path = cache_dir / f"md-{key}.html"
+    try:
+        html_content = path.read_text(encoding="utf-8")
+        os.utime(path)
+        logger.info("[Notifier] 命中邮件渲染缓存")
+        return html_content
+    except OSError:
+        pass
+
+    html_content = markdown.markdown(
+        markdown_content,
+        extensions=['extra', 'codehilite', 'nl2br']
+    )
+
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(html_content, encoding="utf-8")
+        os.replace(tmp, path)
+
+        entries = sorted(cache_dir.glob("md-*.html"), key=lambda p: p.stat().st_mtime)
+        for old in entries[: max(len(entries) - config.EMAIL_HTML_CACHE_MAX_ENTRIES, 0)]:
+            old.unlink(missing_ok=True)
+    except OSError as e:
+        logger.warning("[Notifier] 写入邮件渲染缓存失败: %s", e)
+    return html_content
+
+
+def _build_email_text(results: List[Tuple[Paper, str]], today: str) -> str:
+    """构建邮件的纯文本后备内容：只列出标题与链接，完整总结见 HTML 版本。"""
+    lines = [
+        f"SystemPaperDaily — {today}",
+        f"今日新增 {len(results)} 篇系统领域论文 (完整 AI 总结请使用支持 HTML 的客户端查看)",
+        "",
+    ]
+    for idx, (paper, _) in enumerate(results, 1):
+        lines.append(f"{idx}. {paper.title}")
+        if paper.html_url:
+            lines.append(f"   {paper.html_url}")
+        if paper.pdf_url:
+            lines.append(f"   PDF: {paper.pdf_url}")
+    return "\n".join(lines) + "\n"
+
+
 def _build_email_markdown(results: List[Tuple[Paper, str]], today: str) -> str:
     """构建邮件的 Markdown 内容。"""
     lines = [
@@ -386,7 +551,7 @@ def _build_email_markdown(results: List[Tuple[Paper, str]], today: str) -> str:
             meta_items.append(f"**作者**: {', '.join(paper.authors[:3])}" + 
                             (" et al." if len(paper.authors) > 3 else ""))
         if paper.categories:
-            meta_items.append(f"**分类**: {', '.join(paper.categories)}")
+            meta_items.append(f"**分类**: {paper.categories_str}")
         if paper.published:
             meta_items.append(f"**发布**: {paper.published}")
         
@@ -5,11 +5,15 @@
 
 from __future__ import annotations
 
-import io
+import hashlib
 import logging
-from typing import Optional
+import os
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
 
 try:
     import fitz  # PyMuPDF
@@ -21,6 +25,87 @@ from src.sources.base import Paper
 
 logger = logging.getLogger(__name__)
 
+# 所有 PDF 下载共用一个 Session：并发线程复用同一连接池中的 keep-alive 连接，
+# 避免每篇论文都重新建立 TCP/TLS 连接
+_SESSION = requests.Session()
+_SESSION.headers["User-Agent"] = "Mozilla/5.0 (research bot)"
+# PDF 本身已压缩，gzip 传输只会白白消耗 CPU
+_SESSION.headers["Accept-Encoding"] = "identity"
+_SESSION.mount("https://", HTTPAdapter(pool_maxsize=config.PDF_WORKERS))
+_SESSION.mount("http://", HTTPAdapter(pool_maxsize=config.PDF_WORKERS))
+
+_DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# 乱码字符 (NUL / Unicode 替换字符) 占比超过该值时视为提取失败；
+# 数学字体偶尔产生的零星替换字符不受影响
+_GARBLED_RATIO = 0.02
+
+
+def is_garbled(text: str) -> bool:
+    """判断提取出的文本是否为乱码 (例如字体缺少 ToUnicode 映射)。"""
+    if not text:
+        return False
+    bad = text.count("\ufffd") + text.count("\x00")
+    return bad > len(text) * _GARBLED_RATIO
+
+
+def _download_pdf(url: str, timeout: int) -> Optional[bytearray]:
+    """流式下载 PDF 到 bytearray，超过 config.PDF_MAX_BYTES 时中止并返回 None。"""
+    max_bytes = config.PDF_MAX_BYTES
+    with _SESSION.get(url, timeout=timeout, stream=True) as response:
+        response.raise_for_status()
+        content_length = response.headers.get("Content-Length")
+        if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+            logger.warning(
+                "[PDF Extractor] PDF 过大 (%s 字节)，跳过: %s", content_length, url,
+            )
+            return None
+
+        buf = bytearray()
+        for chunk in response.iter_content(_DOWNLOAD_CHUNK_SIZE):
+            buf += chunk
+            if len(buf) > max_bytes:
+                logger.warning(
+                    "[PDF Extractor] PDF 超过 %d 字节上限，中止下载: %s", max_bytes, url,
+                )
+                return None
+    return buf
+
+
+# ── 提取结果磁盘缓存 ────────────────────────────
+def _cache_path(key_parts: tuple) -> Path:
+    """由论文 ID、PDF 链接与提取参数计算缓存文件路径。"""
+    key = hashlib.sha1("|".join(map(str, key_parts)).encode("utf-8")).hexdigest()
+    return Path(config.CACHE_DIR) / config.PDF_CACHE_SUBDIR / f"{key}.txt"
+
+
+def _read_cache(path: Path) -> Optional[str]:
+    """读取缓存的提取结果，命中时刷新 mtime (用于按最近使用淘汰)。"""
+    try:
+        text = path.read_text(encoding="utf-8")
+        os.utime(path)
+    except OSError:
+        return None
+    return text
+
+
+def _write_cache(path: Path, text: str) -> None:
+    """原子地写入提取结果，并将缓存条目数控制在 PDF_CACHE_MAX_ENTRIES 以内。"""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(text, encoding="utf-8")
+        os.replace(tmp, path)
+
+        entries = list(path.parent.glob("*.txt"))
+        excess = len(entries) - config.PDF_CACHE_MAX_ENTRIES
+        if excess > 0:
+            entries.sort(key=lambda p: p.stat().st_mtime)
+            for old in entries[:excess]:
+                old.unlink(missing_ok=True)
+    except OSError as e:
+        logger.warning("[PDF Extractor] 写入提取缓存失败: %s", e)
+
 
 def extract_paper_content(
     paper: Paper,
@@ -54,6 +139,15 @@ def extract_paper_content(
         logger.warning("[PDF Extractor] 论文无 PDF 链接: %s", paper.title[:60])
         return None
 
+    # 重跑 / 重试时直接复用已提取的文本，跳过下载与解析
+    cache_path = _cache_path((
+        paper.paper_id, paper.pdf_url, extract_mode, first_n_pages, last_n_pages, max_chars,
+    ))
+    cached = _read_cache(cache_path)
+    if cached is not None:
+        logger.info("[PDF Extractor] 命中提取缓存 (论文: %s)", paper.title[:60])
+        return cached
+
     if fitz is None:
         logger.error("[PDF Extractor] PyMuPDF 未安装，请运行: pip install PyMuPDF")
         return None
@@ -61,56 +155,48 @@ def extract_paper_content(
     try:
         # 1. 下载 PDF
         logger.info("[PDF Extractor] 下载 PDF: %s", paper.pdf_url)
-        response = requests.get(
-            paper.pdf_url,
-            timeout=timeout,
-            headers={"User-Agent": "Mozilla/5.0 (research bot)"},
-        )
-        response.raise_for_status()
+        pdf_bytes = _download_pdf(paper.pdf_url, timeout)
+        if pdf_bytes is None:
+            return None
 
         # 2. 解析 PDF
-        pdf_bytes = io.BytesIO(response.content)
         doc = fitz.open(stream=pdf_bytes, filetype="pdf")
         total_pages = doc.page_count
 
-        # 3. 根据模式提取页面文本
-        extracted_text_parts = []
-
+        # 3. 根据模式确定要提取的页面区间
         if extract_mode == "full":
             # 全文模式：提取所有页面
             logger.info(
                 "[PDF Extractor] PDF 总页数: %d，全文提取模式",
                 total_pages,
             )
-            for page_num in range(total_pages):
-                page = doc.load_page(page_num)
-                text = page.get_text("text")
-                extracted_text_parts.append(f"\n--- Page {page_num + 1} ---\n{text}")
-        
+            page_ranges = [(0, total_pages)]
         else:
-            # 部分模式：提取前 N 页 + 最后 N 页
+            # 部分模式：提取前 N 页 + 最后 N 页（避免与前 N 页重复）
             logger.info(
                 "[PDF Extractor] PDF 总页数: %d，提取前 %d 页 + 最后 %d 页",
                 total_pages, first_n_pages, last_n_pages,
             )
-            
-            # 提取前 N 页
-            for page_num in range(min(first_n_pages, total_pages)):
-                page = doc.load_page(page_num)
-                text = page.get_text("text")
-                extracted_text_parts.append(f"\n--- Page {page_num + 1} ---\n{text}")
-
-            # 提取最后 N 页（避免与前 N 页重复）
             last_start = max(first_n_pages, total_pages - last_n_pages)
-            for page_num in range(last_start, total_pages):
-                page = doc.load_page(page_num)
-                text = page.get_text("text")
-                extracted_text_parts.append(f"\n--- Page {page_num + 1} ---\n{text}")
+            page_ranges = [(0, min(first_n_pages, total_pages)), (last_start, total_pages)]
 
-        doc.close()
+        # 用 doc.pages() 顺序迭代页面，避免逐页 load_page 重复查找；
+        # 累计字符数达到 max_chars 后其余页面反正会被截掉，直接停止提取
+        extracted_text_parts = []
+        total_chars = 0
+        with doc:
+            for range_start, range_stop in page_ranges:
+                if range_start >= range_stop or total_chars >= max_chars:
+                    continue
+                for page in doc.pages(range_start, range_stop):
+                    part = f"\n--- Page {page.number + 1} ---\n{page.get_text('text')}\n"
+                    extracted_text_parts.append(part)
+                    total_chars += len(part)
+                    if total_chars >= max_chars:
+                        break
 
         # 4. 合并并截断
-        full_text = "\n".join(extracted_text_parts)
+        full_text = "".join(extracted_text_parts)
         if len(full_text) > max_chars:
             full_text = full_text[:max_chars] + "\n\n[... 内容已截断 ...]"
 
@@ -118,6 +204,7 @@ def extract_paper_content(
             "[PDF Extractor] 成功提取 %d 字符 (论文: %s)",
             len(full_text), paper.title[:60],
         )
+        _write_cache(cache_path, full_text)
         return full_text
 
     except requests.RequestException as e:
@@ -133,3 +220,45 @@ def extract_paper_content(
             paper.title[:60], e, exc_info=True,
         )
         return None
+
+
+def extract_many(
+    papers: Iterable[Paper],
+    max_workers: Optional[int] = None,
+    task_timeout: Optional[float] = None,
+) -> Iterator[tuple[Paper, Optional[str]]]:
+    """
+    在线程池中并发提取多篇论文，按输入顺序逐篇产出 (paper, 内容)。
+
+    下载与 PyMuPDF 解析都会释放 GIL；调用方逐篇消费结果时，后续论文已在后台提前提取。
+
+    Args:
+        papers: 待提取的论文列表。
+        max_workers: 并发线程数，默认 config.PDF_WORKERS。
+        task_timeout: 单篇等待结果的最长时间（秒），默认 PDF_TIMEOUT 的两倍；超时视为提取失败。
+
+    Yields:
+        (paper, 提取的文本内容或 None)。
+    """
+    papers = list(papers)
+    if not papers:
+        return
+    max_workers = max_workers or config.PDF_WORKERS
+    task_timeout = task_timeout or config.PDF_TIMEOUT * 2
+
+    # 不使用 with：with 退出时会 join 所有线程，超时卡住的线程会阻塞整个流程
+    pool = ThreadPoolExecutor(max_workers=min(max_workers, len(papers)))
+    try:
+        futures = [pool.submit(extract_paper_content, p) for p in papers]
+        for paper, future in zip(papers, futures):
+            try:
+                content = future.result(timeout=task_timeout)
+            except FutureTimeoutError:
+                logger.error(
+                    "[PDF Extractor] 提取超时 (%.0f 秒): %s", task_timeout, paper.title[:60],
+                )
+                content = None
+            yield paper, content
+    finally:
+        # 正常结束时只剩超时的任务仍在运行；调用方提前停止时取消排队中的任务。两种情况都不等待
+        pool.shutdown(wait=False, cancel_futures=True)
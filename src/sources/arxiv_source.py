@@ -6,7 +6,7 @@ from __future__ import annotations
 
 import logging
 from datetime import datetime, timedelta, timezone
-from typing import List
+from typing import List, Sequence
 
 import arxiv
 
@@ -20,7 +20,7 @@ class ArxivSource(PaperSource):
 
     def __init__(
         self,
-        categories: List[str],
+        categories: Sequence[str],
         max_results: int = 30,
         recent_hours: int = 48,
     ):
@@ -30,14 +30,21 @@ class ArxivSource(PaperSource):
 
     def fetch(self) -> List[Paper]:
         """查询多个 arXiv 分类，返回指定时间窗口内的论文。"""
+        utc = timezone.utc
         papers: List[Paper] = []
-        cutoff = datetime.now(timezone.utc) - timedelta(hours=self.recent_hours)
+        cutoff = datetime.now(utc) - timedelta(hours=self.recent_hours)
 
         # 构建 OR 查询: cat:cs.OS OR cat:cs.DC OR cat:cs.NI
         query = " OR ".join(f"cat:{cat}" for cat in self.categories)
         logger.info("[ArxivSource] 查询: %s  (截止: %s)", query, cutoff.isoformat())
 
-        client = arxiv.Client()
+        # 一页即可容纳全部结果时只发一次 HTTP 请求；
+        # 请求间隔保持 arXiv API 使用条款要求的 3 秒
+        client = arxiv.Client(
+            page_size=min(self.max_results, 100),
+            delay_seconds=3.0,
+            num_retries=3,
+        )
         search = arxiv.Search(
             query=query,
             max_results=self.max_results,
@@ -47,24 +54,28 @@ class ArxivSource(PaperSource):
 
         try:
             for result in client.results(search):
-                # 发布时间早于截止线则跳过
-                pub_time = result.published.replace(tzinfo=timezone.utc)
+                # 结果按提交时间降序排列：第一篇早于截止线的论文之后全是旧论文，
+                # 直接停止迭代，也不再翻页请求
+                # arxiv 库返回的时间已带 UTC 时区，仅在缺失时补上
+                pub_time = result.published
+                if pub_time.tzinfo is None:
+                    pub_time = pub_time.replace(tzinfo=utc)
                 if pub_time < cutoff:
-                    logger.debug("[ArxivSource] 跳过旧论文: %s (%s)", result.title, pub_time)
-                    continue
+                    logger.debug("[ArxivSource] 遇到旧论文，停止: %s (%s)", result.title, pub_time)
+                    break
 
-                paper = Paper(
-                    paper_id=result.entry_id.split("/abs/")[-1],
+                entry_id = result.entry_id
+                papers.append(Paper(
+                    paper_id=entry_id.split("/abs/")[-1],
                     title=result.title.strip().replace("\n", " "),
                     authors=[a.name for a in result.authors],
                     abstract=result.summary.strip().replace("\n", " "),
                     pdf_url=result.pdf_url or "",
-                    html_url=result.entry_id,
+                    html_url=entry_id,
                     published=pub_time.isoformat(),
-                    categories=[c for c in result.categories],
+                    categories=list(result.categories),
                     source="arxiv",
-                )
-                papers.append(paper)
+                ))
 
             logger.info("[ArxivSource] 获取到 %d 篇论文", len(papers))
         except Exception as e:
@@ -4,17 +4,48 @@
 
 from __future__ import annotations
 
+import functools
 import logging
+import re
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import List
+from typing import Callable, FrozenSet, Iterable, List
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+try:
+    import ahocorasick  # 可选：关键词很多时用 Aho-Corasick 自动机单遍匹配
+except ImportError:
+    ahocorasick = None
+
+# 关键词数量超过该值且安装了 pyahocorasick 时改用自动机，否则使用正则
+_AHOCORASICK_MIN_KEYWORDS = 50
+
+
+@functools.lru_cache(maxsize=8)
+def _keyword_pattern(keywords: FrozenSet[str]) -> re.Pattern:
+    """将一组关键词编译为单个正则 (匹配已转小写的文本)，同一组关键词只编译一次。"""
+    return re.compile("|".join(re.escape(kw.lower()) for kw in keywords))
+
+
+@functools.lru_cache(maxsize=8)
+def _keyword_matcher(keywords: FrozenSet[str]) -> Callable[[str], bool]:
+    """为一组关键词构建匹配函数 (小写文本中包含任意关键词即返回 True)，同一组关键词只构建一次。"""
+    if ahocorasick is not None and len(keywords) > _AHOCORASICK_MIN_KEYWORDS:
+        automaton = ahocorasick.Automaton()
+        for kw in keywords:
+            automaton.add_word(kw.lower(), kw)
+        automaton.make_automaton()
+        return lambda text: next(automaton.iter(text), None) is not None
+
+    pattern = _keyword_pattern(keywords)
+    return lambda text: pattern.search(text) is not None
+
+
+@dataclass(frozen=True, slots=True)
 class Paper:
-    """统一的论文数据结构。"""
+    """统一的论文数据结构 (不可变，使用 __slots__ 以减少大批量实例的内存占用)。"""
 
     paper_id: str                    # 唯一标识 (arXiv ID / RSS entry id)
     title: str                       # 论文标题
@@ -25,11 +56,25 @@ class Paper:
     published: str = ""              # 发布日期 (ISO 格式字符串)
     categories: List[str] = field(default_factory=list)
     source: str = ""                 # 来源标记: "arxiv" / "rss"
+    # 旧版本为同一条目生成的 ID，去重时与 paper_id 一并检查
+    legacy_ids: List[str] = field(default_factory=list, repr=False, compare=False)
+    # 派生字段：构造时拼接一次，格式化 Issue / 邮件时直接复用
+    authors_str: str = field(init=False, repr=False, compare=False)
+    categories_str: str = field(init=False, repr=False, compare=False)
+    search_text: str = field(init=False, repr=False, compare=False)  # 小写的 "标题 摘要"，用于关键词匹配
+
+    def __post_init__(self) -> None:
+        # frozen + slots 下无法使用 cached_property，通过 object.__setattr__ 写入派生字段
+        object.__setattr__(self, "authors_str", ", ".join(self.authors))
+        object.__setattr__(self, "categories_str", ", ".join(self.categories))
+        object.__setattr__(self, "search_text", f"{self.title} {self.abstract}".lower())
 
-    def match_keywords(self, keywords: List[str]) -> bool:
-        """检查标题或摘要是否包含任意关键词（不区分大小写）。"""
-        text = (self.title + " " + self.abstract).lower()
-        return any(kw.lower() in text for kw in keywords)
+    def match_keywords(self, keywords: Iterable[str]) -> bool:
+        """检查标题或摘要是否包含任意关键词（不区分大小写），对文本只扫描一遍。"""
+        keywords = frozenset(keywords)
+        if not keywords:
+            return False
+        return _keyword_matcher(keywords)(self.search_text)
 
 
 class PaperSource(ABC):
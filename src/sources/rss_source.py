@@ -5,13 +5,18 @@ RSS 数据源 — 解析 USENIX / 会议级 RSS Feed。
 from __future__ import annotations
 
 import hashlib
+import json
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional
+from pathlib import Path
+from typing import List, Optional, Sequence
 
 import feedparser
 from email.utils import parsedate_to_datetime
 
+import config
 from .base import Paper, PaperSource
 
 logger = logging.getLogger(__name__)
@@ -19,33 +24,81 @@ logger = logging.getLogger(__name__)
 
 def _parse_pub_date(entry) -> Optional[datetime]:
     """尝试从 RSS entry 中解析发布时间。"""
+    utc = timezone.utc
     for field in ("published", "updated", "created"):
-        raw = getattr(entry, field, None) or entry.get(field)
+        raw = entry.get(field)
         if raw:
             try:
                 dt = parsedate_to_datetime(raw)
-                if dt.tzinfo is None:
-                    dt = dt.replace(tzinfo=timezone.utc)
-                return dt
-            except Exception:
-                pass
+            except (TypeError, ValueError):
+                continue
+            return dt if dt.tzinfo is not None else dt.replace(tzinfo=utc)
 
     # feedparser 解析的 struct_time
     for field in ("published_parsed", "updated_parsed"):
         st = entry.get(field)
         if st:
             try:
-                return datetime(*st[:6], tzinfo=timezone.utc)
-            except Exception:
+                return datetime(*st[:6], tzinfo=utc)
+            except (TypeError, ValueError):
                 pass
 
     return None
 
 
+def _entry_raw_id(entry) -> str:
+    return entry.get("id") or entry.get("link") or entry.get("title", "")
+
+
 def _entry_id(entry) -> str:
     """为 RSS 条目生成稳定 ID。"""
-    raw_id = entry.get("id") or entry.get("link") or entry.get("title", "")
-    return hashlib.sha256(raw_id.encode("utf-8")).hexdigest()[:16]
+    # 仅用于去重的非密码学 ID：blake2b 直接输出 8 字节摘要 (16 位十六进制)，无需截断
+    return hashlib.blake2b(_entry_raw_id(entry).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _legacy_entry_id(entry) -> str:
+    """旧版本的条目 ID (sha256 截断)，用于识别改用 blake2b 之前已归档的条目。"""
+    return hashlib.sha256(_entry_raw_id(entry).encode("utf-8")).hexdigest()[:16]
+
+
+def _state_path() -> Path:
+    return Path(config.CACHE_DIR) / config.RSS_STATE_FILE
+
+
+def _load_feed_state() -> dict[str, dict[str, str]]:
+    """读取上次记录的各 Feed ETag / Last-Modified。"""
+    try:
+        with open(_state_path(), encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return state if isinstance(state, dict) else {}
+
+
+def _save_feed_state(state: dict[str, dict[str, str]]) -> None:
+    """原子地保存各 Feed ETag / Last-Modified。"""
+    path = _state_path()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(state, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.warning("[RSSSource] 保存 Feed 缓存状态失败: %s", e)
+
+
+def _parse_feed(url: str, validators: dict[str, str]):
+    """下载并解析单个 Feed (带上次的 ETag / Last-Modified 发起条件请求)，失败时返回 None。"""
+    logger.info("[RSSSource] 正在解析 Feed: %s", url)
+    try:
+        return feedparser.parse(
+            url,
+            etag=validators.get("etag"),
+            modified=validators.get("modified"),
+        )
+    except Exception as e:
+        logger.error("[RSSSource] 解析失败 %s: %s", url, e)
+        return None
 
 
 class RSSSource(PaperSource):
@@ -53,24 +106,55 @@ class RSSSource(PaperSource):
 
     def __init__(
         self,
-        feed_urls: List[str],
+        feed_urls: Sequence[str],
         recent_hours: int = 72,
     ):
         self.feed_urls = feed_urls
         self.recent_hours = recent_hours
+        # 本次抓取得到的 ETag / Last-Modified，待条目归档成功后由 save_feed_state() 写入
+        self._pending_state: Optional[dict[str, dict[str, str]]] = None
+
+    def save_feed_state(self) -> None:
+        """
+        保存本次抓取的 Feed 缓存状态。
+
+        只能在本次抓取的条目都已归档 (或被过滤) 后调用：状态一旦保存，
+        下次运行的条件请求会得到 304，未归档的条目将不会再出现。
+        """
+        if self._pending_state is not None:
+            _save_feed_state(self._pending_state)
+            self._pending_state = None
 
     def fetch(self) -> List[Paper]:
         papers: List[Paper] = []
         cutoff = datetime.now(timezone.utc) - timedelta(hours=self.recent_hours)
 
-        for url in self.feed_urls:
-            logger.info("[RSSSource] 正在解析 Feed: %s", url)
-            try:
-                feed = feedparser.parse(url)
-            except Exception as e:
-                logger.error("[RSSSource] 解析失败 %s: %s", url, e)
+        urls = list(self.feed_urls)
+        if not urls:
+            return papers
+
+        # 各 Feed 的下载互不依赖，并发拉取；条目解析仍按 Feed 顺序串行进行
+        state = _load_feed_state()
+        with ThreadPoolExecutor(max_workers=min(16, len(urls))) as pool:
+            feeds = list(pool.map(_parse_feed, urls, [state.get(url, {}) for url in urls]))
+
+        for url, feed in zip(urls, feeds):
+            if feed is None:
                 continue
 
+            # 服务端返回 304：Feed 自上次成功归档后未变化 (状态只在归档成功后保存)
+            if feed.get("status") == 304:
+                logger.info("[RSSSource] Feed 未更新 (304)，跳过: %s", url)
+                continue
+
+            validators = {
+                key: feed[key] for key in ("etag", "modified") if feed.get(key)
+            }
+            if validators:
+                state[url] = validators
+            else:
+                state.pop(url, None)
+
             if feed.bozo and feed.bozo_exception:
                 logger.warning("[RSSSource] Feed 解析警告 (%s): %s", url, feed.bozo_exception)
 
@@ -100,9 +184,11 @@ class RSSSource(PaperSource):
                     published=pub_date.isoformat() if pub_date else "",
                     categories=[],
                     source="rss",
+                    legacy_ids=[f"rss-{_legacy_entry_id(entry)}"],
                 )
                 papers.append(paper)
 
             logger.info("[RSSSource] %s 获取到 %d 条", url, len(papers))
 
+        self._pending_state = state
         return papers
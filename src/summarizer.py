@@ -4,26 +4,183 @@
 
 from __future__ import annotations
 
+import atexit
+import functools
+import importlib.util
 import logging
+import random
+import re
+import threading
 import time
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional
 
 try:
     from google import genai
+    from google.genai import errors as genai_errors
     from google.genai import types as genai_types
 except ImportError:
     genai = None
+    genai_errors = None
     genai_types = None
 
 try:
+    import tiktoken  # 可选：按 token 而非字符截断输入
+except ImportError:
+    tiktoken = None
+
+try:
+    import httpx
+    import openai
     from openai import OpenAI
 except ImportError:
+    httpx = None
+    openai = None
     OpenAI = None
 
 import config
+from src.summary_cache import LLMCache
 
 logger = logging.getLogger(__name__)
 
+# 总结结果缓存：相同模型 + 提示词 + 温度直接复用上次的总结
+_SUMMARY_CACHE = LLMCache(
+    Path(config.CACHE_DIR) / config.LLM_CACHE_FILE,
+    ttl_seconds=config.LLM_CACHE_TTL_DAYS * 86400,
+)
+atexit.register(_SUMMARY_CACHE.close)
+
+
+# 批量总结被中断时置位：之后不再发起新请求，重试等待也立即结束
+_SHUTDOWN = threading.Event()
+
+
+class _ShutdownRequested(Exception):
+    """收到中断后放弃尚未发出的请求。"""
+
+
+def _check_shutdown() -> None:
+    if _SHUTDOWN.is_set():
+        raise _ShutdownRequested()
+
+
+def _sleep(seconds: float) -> None:
+    """可被 _SHUTDOWN 打断的 sleep，打断时抛出 _ShutdownRequested。"""
+    if _SHUTDOWN.wait(seconds):
+        raise _ShutdownRequested()
+
+
+class _StartLimiter:
+    """保证相邻两次请求的起始时间至少间隔 interval 秒 (线程安全，按到达顺序排队)。"""
+
+    def __init__(self, interval: float):
+        self._interval = interval
+        self._next_start = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        _check_shutdown()
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self._interval
+        if start > now:
+            logger.debug("[Summarizer] 等待 %.1f 秒 (REQUEST_SLEEP)...", start - now)
+            _sleep(start - now)
+
+
+# 所有提供商共用的请求节流：缓存命中不占用名额
+_START_LIMITER = _StartLimiter(config.REQUEST_SLEEP)
+
+# OpenAI 风格的重置时长，例如 "1s" / "6m0s" / "20ms"
+_RESET_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+def _parse_reset_duration(value: str) -> Optional[float]:
+    """解析 x-ratelimit-reset-* 形式的时长字符串，无法解析时返回 None。"""
+    parts = _RESET_DURATION_RE.findall(value)
+    if not parts:
+        return None
+    return sum(float(num) * _DURATION_UNITS[unit] for num, unit in parts)
+
+
+def _gemini_retry_delay(error: Exception) -> Optional[float]:
+    """读取 Gemini 429 错误详情中的 RetryInfo (例如 "retryDelay": "23s")，没有时返回 None。"""
+    if genai_errors is None or not isinstance(error, genai_errors.APIError):
+        return None
+    details = error.details.get("error", {}).get("details", []) if isinstance(error.details, dict) else []
+    for detail in details:
+        if isinstance(detail, dict) and detail.get("retryDelay"):
+            return _parse_reset_duration(str(detail["retryDelay"]))
+    return None
+
+
+def _retry_delay(error: Exception, attempt: int, base_delay: float) -> float:
+    """
+    计算 429 后的重试等待秒数。
+
+    优先使用服务端给出的等待时间 (Retry-After / retry-after-ms / x-ratelimit-reset-requests 响应头，
+    或 Gemini 错误详情中的 retryDelay)；都没有时退回指数退避并加上随机抖动，避免并发请求同时重试。
+    """
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except ValueError:
+        pass
+    reset = headers.get("x-ratelimit-reset-requests")
+    if reset:
+        delay = _parse_reset_duration(reset)
+        if delay is not None:
+            return delay
+
+    delay = _gemini_retry_delay(error)
+    if delay is not None:
+        return delay
+
+    return base_delay * (2 ** attempt) + random.uniform(0, base_delay)
+
+
+# ── 提供商冷却 (故障切换) ──────────────────────────
+# provider → 冷却结束时间 (time.monotonic)；冷却期间 summarize() 优先使用备用提供商。
+# 只有存在备用提供商时才会冷却，且全部冷却时仍会尝试最早恢复的提供商
+_provider_cooldowns: dict[str, float] = {}
+_cooldown_lock = threading.Lock()
+
+
+def _is_transient_error(error: Exception) -> bool:
+    """超时 / 连接 / 服务端 5xx 错误视为暂时性故障 (限流由调用方单独判断)。"""
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    if openai is not None:
+        if isinstance(error, (openai.APITimeoutError, openai.APIConnectionError)):
+            return True
+        if isinstance(error, openai.APIStatusError) and error.status_code >= 500:
+            return True
+    if httpx is not None and isinstance(error, httpx.TransportError):
+        return True
+    return genai_errors is not None and isinstance(error, genai_errors.ServerError)
+
+
+def _cool_down(provider: str) -> None:
+    """让提供商进入冷却期 (没有其他可用提供商可切换时不冷却)。"""
+    if not any(name != provider for name, _ in _configured_providers()):
+        return
+    with _cooldown_lock:
+        _provider_cooldowns[provider] = time.monotonic() + config.LLM_PROVIDER_COOLDOWN
+    logger.warning("[Summarizer] %s 暂时不可用，冷却 %d 秒", provider, config.LLM_PROVIDER_COOLDOWN)
+
+
+def _cooldown_remaining(provider: str) -> float:
+    """提供商剩余冷却秒数，不在冷却期时为 0。"""
+    with _cooldown_lock:
+        return max(0.0, _provider_cooldowns.get(provider, 0.0) - time.monotonic())
+
+
 # ── System Prompt ──────────────────────────────────────
 
 SYSTEM_PROMPT = """\
@@ -63,276 +220,621 @@ SYSTEM_PROMPT = """\
 """
 
 
-def _init_gemini_client() -> "genai.Client":
-    """初始化 Gemini 客户端。"""
-    client = genai.Client(api_key=config.GEMINI_API_KEY)
-    return client
+# 根据 PDF 提取模式确定输入内容描述与输入字符上限 (运行期间不变，只计算一次)
+# 安装了 tiktoken 时按 token 截断 (_TOKEN_LIMIT)，否则退回按字符截断 (_CHAR_LIMIT)
+if config.PDF_EXTRACT_MODE == "full":
+    _CONTENT_DESC = "一篇系统领域论文的完整全文内容"
+    _CHAR_LIMIT = 30000  # 全文模式下提取更多字符
+    _TOKEN_LIMIT = 16000
+else:
+    _CONTENT_DESC = "一篇系统领域论文的前3页和最后1页内容（包含摘要、引言和结论）"
+    _CHAR_LIMIT = 12000
+    _TOKEN_LIMIT = 6000
+
+# 实际发送的系统提示词：固定模板 + 本次运行的输入描述，对所有请求逐字节相同；
+# 用户消息只包含论文文本，便于命中提供商侧的前缀缓存 (prompt caching)
+_SYSTEM_INSTRUCTION = (
+    f"{SYSTEM_PROMPT}\n"
+    f"### Input\n"
+    f"用户消息的代码块中是{_CONTENT_DESC}，请按照要求生成深度摘要。\n"
+)
+
 
+# OpenAI 兼容接口的系统消息：所有请求共用同一个对象 (SDK 只读取、不修改 messages)
+_SYSTEM_MESSAGE = {"role": "system", "content": _SYSTEM_INSTRUCTION}
 
-# 模块级 lazy 单例
-_gemini_client: Optional["genai.Client"] = None
-_deepseek_client: Optional[OpenAI] = None
-_openai_client: Optional[OpenAI] = None
 
+@functools.cache
+def _get_encoder():
+    """获取 tiktoken 编码器 (构建开销大，只加载一次)；不可用时返回 None。"""
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning("[Summarizer] 加载 tiktoken 编码器失败，改为按字符截断: %s", e)
+        return None
 
+
+def _truncate_input(text_content: str) -> str:
+    """
+    将论文文本截断到输入上限。
+
+    按 token 截断能让英文论文放入更多内容，同时避免中文内容超出模型上下文；
+    没有 tiktoken 时按字符截断。
+    """
+    encoder = _get_encoder()
+    if encoder is None:
+        return text_content[:_CHAR_LIMIT]
+    # cl100k 是字节级 BPE，每个 token 至少覆盖一个 UTF-8 字节 (一个汉字常被拆成多个 token)：
+    # 字节数不超过上限时 token 数必然也不超过，无需编码
+    if len(text_content.encode("utf-8")) <= _TOKEN_LIMIT:
+        return text_content
+    tokens = encoder.encode(text_content, disallowed_special=())
+    if len(tokens) <= _TOKEN_LIMIT:
+        return text_content
+    return encoder.decode(tokens[:_TOKEN_LIMIT])
+
+
+def _build_user_prompt(text_content: str) -> str:
+    """构建用户提示词 (在重试循环之外调用一次，重试时复用)。"""
+    return f"```\n{_truncate_input(text_content)}\n```"
+
+
+def _render_short_summary(text_content: str) -> str:
+    """输入过短时不调用 LLM，直接以引用块输出原文。"""
+    quoted = "\n".join(f"> {line}" for line in text_content.strip().splitlines())
+    return f"_内容过短，未生成 AI 总结，以下为原文：_\n\n{quoted}"
+
+
+def _client_singleton(factory):
+    """
+    将无参工厂函数包装为 lazy 单例。
+
+    lru_cache 本身不保证并发首次调用时只构建一次 (warmup 线程与总结线程可能同时调用)，
+    因此构建过程加锁；返回的函数保留 cache_clear() 供 _reset_clients() 使用。
+    """
+    cached = functools.lru_cache(maxsize=1)(factory)
+    lock = threading.Lock()
+
+    @functools.wraps(factory)
+    def get():
+        with lock:
+            return cached()
+
+    get.cache_clear = cached.cache_clear
+    return get
+
+
+# 客户端均为 lazy 单例 (每个进程只构建一次)，_reset_clients() 可清空
+@_client_singleton
+def _get_http_client() -> "httpx.Client":
+    """获取 DeepSeek / OpenAI 客户端共用的 httpx 连接池 (keep-alive，安装了 h2 时启用 HTTP/2)。"""
+    client = httpx.Client(
+        limits=httpx.Limits(
+            max_keepalive_connections=20,
+            max_connections=100,
+            keepalive_expiry=30.0,
+        ),
+        timeout=httpx.Timeout(120.0, connect=10.0),
+        http2=importlib.util.find_spec("h2") is not None,
+    )
+    atexit.register(client.close)
+    return client
+
+
+@_client_singleton
 def _get_gemini_client() -> "genai.Client":
     """获取 Gemini 客户端单例。"""
-    global _gemini_client
-    if _gemini_client is None:
-        _gemini_client = _init_gemini_client()
-    return _gemini_client
+    return genai.Client(api_key=config.GEMINI_API_KEY)
+
+
+# ── Gemini 显式上下文缓存 ──────────────────────────
+# 系统提示词在服务端缓存一次，之后的请求通过 cached_content 引用，不再重复计费
+_gemini_context_cache: Optional[str] = None   # CachedContent.name
+_gemini_context_cache_expires = 0.0            # time.monotonic() 时刻
+_gemini_context_cache_disabled = False
+_gemini_context_cache_lock = threading.Lock()
+
 
+def _get_gemini_context_cache(client: "genai.Client") -> Optional[str]:
+    """
+    获取 (必要时创建) 包含系统提示词的 Gemini CachedContent，返回其名称。
 
+    模型不支持或提示词低于最小缓存长度时创建会失败，此后本次运行不再尝试，
+    调用方退回每次发送 system_instruction。
+    """
+    global _gemini_context_cache, _gemini_context_cache_expires, _gemini_context_cache_disabled
+    with _gemini_context_cache_lock:
+        if _gemini_context_cache_disabled:
+            return None
+        if _gemini_context_cache and time.monotonic() < _gemini_context_cache_expires:
+            return _gemini_context_cache
+        try:
+            cache = client.caches.create(
+                model=config.GEMINI_MODEL,
+                config=genai_types.CreateCachedContentConfig(
+                    system_instruction=_SYSTEM_INSTRUCTION,
+                    ttl=f"{config.GEMINI_CONTEXT_CACHE_TTL}s",
+                ),
+            )
+        except Exception as e:
+            logger.info("[Summarizer/Gemini] 无法创建上下文缓存，改为每次发送系统提示词: %s", e)
+            _gemini_context_cache_disabled = True
+            return None
+        if _gemini_context_cache is None:
+            atexit.register(_delete_gemini_context_cache, client)
+        _gemini_context_cache = cache.name
+        # 提前一分钟视为过期，避免请求途中缓存失效
+        _gemini_context_cache_expires = time.monotonic() + config.GEMINI_CONTEXT_CACHE_TTL - 60
+        logger.info("[Summarizer/Gemini] 已创建上下文缓存: %s", cache.name)
+        return cache.name
+
+
+def _invalidate_gemini_context_cache() -> None:
+    """丢弃当前上下文缓存 (服务端已失效)，下次请求时重新创建。"""
+    global _gemini_context_cache_expires
+    with _gemini_context_cache_lock:
+        _gemini_context_cache_expires = 0.0
+
+
+def _delete_gemini_context_cache(client: "genai.Client") -> None:
+    """退出时删除上下文缓存，避免为剩余有效期继续支付存储费用。"""
+    if not _gemini_context_cache:
+        return
+    try:
+        client.caches.delete(name=_gemini_context_cache)
+    except Exception as e:
+        logger.debug("[Summarizer/Gemini] 删除上下文缓存失败: %s", e)
+
+
+@_client_singleton
 def _get_deepseek_client() -> OpenAI:
     """获取 DeepSeek OpenAI 客户端单例。"""
-    global _deepseek_client
-    if _deepseek_client is None:
-        if OpenAI is None:
-            raise ImportError("请安装 openai 库: pip install openai")
-        _deepseek_client = OpenAI(
-            api_key=config.DEEPSEEK_API_KEY,
-            base_url=config.DEEPSEEK_BASE_URL,
-        )
-        logger.info("[Summarizer] DeepSeek 客户端已初始化")
-    return _deepseek_client
+    if OpenAI is None:
+        raise ImportError("请安装 openai 库: pip install openai")
+    client = OpenAI(
+        api_key=config.DEEPSEEK_API_KEY,
+        base_url=config.DEEPSEEK_BASE_URL,
+        http_client=_get_http_client(),
+    )
+    logger.info("[Summarizer] DeepSeek 客户端已初始化")
+    return client
 
 
+@_client_singleton
 def _get_openai_client() -> OpenAI:
     """获取 OpenAI (ChatGPT) 客户端单例。"""
-    global _openai_client
-    if _openai_client is None:
-        if OpenAI is None:
-            raise ImportError("请安装 openai 库: pip install openai")
-        
-        # 配置验证
-        if not config.OPENAI_API_KEY:
-            raise ValueError("OPENAI_API_KEY 未设置")
-        
-        logger.info(
-            "[Summarizer] 初始化 OpenAI 客户端 - Model: %s, Base URL: %s",
-            config.OPENAI_MODEL, config.OPENAI_BASE_URL
-        )
-        
-        _openai_client = OpenAI(
-            api_key=config.OPENAI_API_KEY,
-            base_url=config.OPENAI_BASE_URL,
-        )
-        logger.info("[Summarizer] OpenAI 客户端已初始化")
-    return _openai_client
-
-
-def _summarize_with_gemini(text_content: str, max_retries: int, base_delay: int) -> str:
-    """使用 Gemini 生成总结（带重试）。"""
+    if OpenAI is None:
+        raise ImportError("请安装 openai 库: pip install openai")
+
+    # 配置验证
+    if not config.OPENAI_API_KEY:
+        raise ValueError("OPENAI_API_KEY 未设置")
+
+    logger.info(
+        "[Summarizer] 初始化 OpenAI 客户端 - Model: %s, Base URL: %s",
+        config.OPENAI_MODEL, config.OPENAI_BASE_URL
+    )
+
+    client = OpenAI(
+        api_key=config.OPENAI_API_KEY,
+        base_url=config.OPENAI_BASE_URL,
+        http_client=_get_http_client(),
+    )
+    logger.info("[Summarizer] OpenAI 客户端已初始化")
+    return client
+
+
+def _reset_clients() -> None:
+    """丢弃已创建的客户端单例 (测试或 fork 后的子进程中使用)，下次调用时重新创建。"""
+    _get_gemini_client.cache_clear()
+    _get_deepseek_client.cache_clear()
+    _get_openai_client.cache_clear()
+    _get_http_client.cache_clear()
+
+
+def _warmup_connection() -> None:
+    """向主提供商发送一个轻量请求，提前完成 TCP + TLS 握手并保留 keep-alive 连接。"""
+    provider = config.LLM_PROVIDER
+    started = time.monotonic()
+    try:
+        if provider == "gemini":
+            if genai is None or not config.GEMINI_API_KEY:
+                return
+            _get_gemini_client().models.count_tokens(model=config.GEMINI_MODEL, contents="warmup")
+        elif provider in _OPENAI_PROVIDERS:
+            _, get_client, _, _ = _OPENAI_PROVIDERS[provider]
+            if OpenAI is None or not _PROVIDERS[provider][1]():
+                return
+            client = get_client()
+            # 只需建立连接，响应状态码 (401/404/405 等) 无关紧要
+            _get_http_client().head(str(client.base_url.join("models")), timeout=5.0)
+        else:
+            return
+    except Exception as e:
+        logger.debug("[Summarizer] 连接预热失败 (不影响后续请求): %s", e)
+        return
+    logger.debug("[Summarizer] %s 连接预热完成 (%.2fs)", provider, time.monotonic() - started)
+
+
+def warmup() -> None:
+    """
+    在后台线程中预热主提供商的 HTTPS 连接，不阻塞调用方。
+
+    应在首次总结前不久调用 (连接池 keep-alive 为 30 秒)，让第一次请求跳过握手开销。
+    """
+    threading.Thread(target=_warmup_connection, name="llm-warmup", daemon=True).start()
+
+
+# ── 流式输出 ──────────────────────────────────────────
+# 模板的最后一节；该节之后模型偶尔继续输出分隔线 / 额外章节，检测到后提前结束流
+_CLOSING_SECTION = "## 💬 落地一句话点评"
+_TRAILING_SECTION_RE = re.compile(r"\n(?:#{1,6} |---)")
+
+
+class _StreamInterrupted(Exception):
+    """流式输出在产出部分内容后失败 (已产出的内容不完整)。"""
+
+
+class _SummaryStream:
+    """累积流式输出的文本片段，并在最后一节结束后截断多余内容。"""
+
+    def __init__(self):
+        self.parts: List[str] = []
+        self.done = False
+        self._window = ""              # 尚未出现最后一节标题时，保留末尾若干字符用于跨片段匹配
+        self._pending: Optional[str] = None  # 最后一节标题之后尚未转发的文本 (按行转发)
+
+    def feed(self, delta: str) -> str:
+        """追加一段输出，返回应转发给调用方的部分 (可能为空)。"""
+        if not self.parts and self._pending is None:
+            delta = delta.lstrip()
+        if not delta or self.done:
+            return ""
+
+        out = ""
+        if self._pending is None:
+            window = self._window + delta
+            idx = window.find(_CLOSING_SECTION)
+            if idx < 0:
+                self._window = window[-len(_CLOSING_SECTION):]
+                return self._emit(delta)
+            # 标题之前 (含标题) 的部分直接转发，之后的部分进入按行缓冲
+            split = len(delta) - (len(window) - idx - len(_CLOSING_SECTION))
+            out, self._pending = delta[:split], delta[split:]
+        else:
+            self._pending += delta
+
+        m = _TRAILING_SECTION_RE.search(self._pending)
+        if m:
+            self.done = True
+            out += self._pending[:m.start()]
+            self._pending = ""
+        else:
+            # 只转发完整的行：未完成的一行可能是多余章节的开头
+            cut = self._pending.rfind("\n")
+            if cut > 0:
+                out += self._pending[:cut]
+                self._pending = self._pending[cut:]
+        return self._emit(out)
+
+    def flush(self) -> str:
+        """流结束时转发缓冲中的剩余文本。"""
+        out, self._pending = self._pending or "", ""
+        return self._emit(out)
+
+    def _emit(self, text: str) -> str:
+        if text:
+            self.parts.append(text)
+        return text
+
+    @property
+    def text(self) -> str:
+        return "".join(self.parts).strip()
+
+
+def _stream_with_gemini(text_content: str, max_retries: int, base_delay: int) -> Iterator[str]:
+    """使用 Gemini 流式生成总结（带重试，仅在输出第一个片段前重试）。"""
     if genai is None:
-        return "⚠️ 未安装 google-genai 库"
-    
+        yield "⚠️ 未安装 google-genai 库"
+        return
+
     client = _get_gemini_client()
-    
-    # 根据 PDF 提取模式调整提示词
-    if config.PDF_EXTRACT_MODE == "full":
-        content_desc = "以下是一篇系统领域论文的完整全文内容"
-        char_limit = 30000  # 全文模式下提取更多字符
-    else:
-        content_desc = "以下是一篇系统领域论文的前3页和最后1页内容（包含摘要、引言和结论）"
-        char_limit = 12000
-    
-    user_prompt = (
-        f"{content_desc}，请按照要求生成深度摘要：\n\n"
-        f"```\n{text_content[:char_limit]}\n```"
-    )
 
+    user_prompt = _build_user_prompt(text_content)
+
+    cache_key = LLMCache.cache_key(config.GEMINI_MODEL, _SYSTEM_INSTRUCTION, user_prompt, config.TEMPERATURE)
+    cached = _SUMMARY_CACHE.get(cache_key)
+    if cached is not None:
+        logger.info("[Summarizer/Gemini] 命中总结缓存 (%d 字符)", len(cached))
+        yield cached
+        return
+
+    _START_LIMITER.wait()
+    deadline = time.monotonic() + config.LLM_RETRY_DEADLINE
+    cache_refreshed = False
     for attempt in range(max_retries + 1):
+        _check_shutdown()
+        context_cache = _get_gemini_context_cache(client)
+        stream = _SummaryStream()
         try:
-            response = client.models.generate_content(
+            has_candidates = False
+            finish_reason = None
+            for chunk in client.models.generate_content_stream(
                 model=config.GEMINI_MODEL,
                 contents=user_prompt,
                 config=genai_types.GenerateContentConfig(
-                    system_instruction=SYSTEM_PROMPT,
+                    # 使用上下文缓存时系统提示词已在缓存中，不能重复指定
+                    cached_content=context_cache,
+                    system_instruction=None if context_cache else _SYSTEM_INSTRUCTION,
                     temperature=config.TEMPERATURE,
                     max_output_tokens=config.GEMINI_MAX_OUTPUT_TOKENS,
                 ),
-            )
+            ):
+                if not chunk.candidates:
+                    continue
+                has_candidates = True
+                finish_reason = getattr(chunk.candidates[0], "finish_reason", None) or finish_reason
+                delta = stream.feed(chunk.text or "")
+                if delta:
+                    yield delta
+                if stream.done:
+                    logger.debug("[Summarizer/Gemini] 最后一节已结束，提前终止输出")
+                    break
+            tail = stream.flush()
+            if tail:
+                yield tail
 
             # 检查是否被安全过滤器拦截
-            if not response.candidates:
+            if not has_candidates:
                 logger.warning("[Summarizer] Gemini 返回空候选，可能被安全过滤器拦截")
-                return "⚠️ 无法生成总结（内容被安全过滤器拦截）"
-
-            candidate = response.candidates[0]
+                yield "⚠️ 无法生成总结（内容被安全过滤器拦截）"
+                return
 
             # 检查 finish_reason
-            if hasattr(candidate, "finish_reason") and candidate.finish_reason not in (None, "STOP"):
-                logger.warning(
-                    "[Summarizer/Gemini] finish_reason=%s", candidate.finish_reason
-                )
+            if finish_reason not in (None, "STOP") and not stream.done:
+                logger.warning("[Summarizer/Gemini] finish_reason=%s", finish_reason)
 
-            text = response.text.strip()
+            text = stream.text
             if not text:
-                return "⚠️ 无法生成总结（模型返回空文本）"
+                yield "⚠️ 无法生成总结（模型返回空文本）"
+                return
 
             logger.info("[Summarizer/Gemini] 成功生成总结 (%d 字符)", len(text))
-            return text
+            _SUMMARY_CACHE.set(cache_key, config.GEMINI_MODEL, text)
+            return
 
         except Exception as e:
-            error_str = str(e)
-            is_rate_limit = "429" in error_str or "ResourceExhausted" in error_str
+            # 已向调用方输出部分内容时无法在此重试，交给调用方处理
+            if stream.parts:
+                logger.error("[Summarizer/Gemini] 输出中断: %s", e, exc_info=True)
+                raise _StreamInterrupted(type(e).__name__) from e
+
+            is_rate_limit = isinstance(e, genai_errors.APIError) and e.code == 429
+
+            # 上下文缓存在服务端过期 / 被删除：重建后立即重试
+            if (
+                context_cache and not cache_refreshed
+                and isinstance(e, genai_errors.ClientError) and e.code in (403, 404)
+            ):
+                logger.warning("[Summarizer/Gemini] 上下文缓存已失效，重新创建: %s", e)
+                _invalidate_gemini_context_cache()
+                cache_refreshed = True
+                continue
 
             if is_rate_limit and attempt < max_retries:
-                delay = base_delay * (2 ** attempt)
-                logger.warning(
-                    "[Summarizer/Gemini] Rate Limit，第 %d/%d 次重试，等待 %ds...",
-                    attempt + 1, max_retries, delay,
-                )
-                time.sleep(delay)
-                continue
+                delay = _retry_delay(e, attempt, base_delay)
+                if time.monotonic() + delay <= deadline:
+                    logger.warning(
+                        "[Summarizer/Gemini] Rate Limit，第 %d/%d 次重试，等待 %.1fs...",
+                        attempt + 1, max_retries, delay,
+                    )
+                    _sleep(delay)
+                    continue
+                logger.warning("[Summarizer/Gemini] 重试等待将超过 LLM_RETRY_DEADLINE，放弃重试")
 
             logger.error("[Summarizer/Gemini] 调用失败: %s", e, exc_info=True)
-            return f"⚠️ Gemini 调用失败: {type(e).__name__}"
-
-    return "⚠️ Gemini 重试次数耗尽"
-
-
-def _summarize_with_deepseek(text_content: str, max_retries: int, base_delay: int) -> str:
-    """使用 DeepSeek 生成总结（带重试）。"""
-    client = _get_deepseek_client()
-    
-    # 根据 PDF 提取模式调整提示词
-    if config.PDF_EXTRACT_MODE == "full":
-        content_desc = "以下是一篇系统领域论文的完整全文内容"
-        char_limit = 30000  # 全文模式下提取更多字符
-    else:
-        content_desc = "以下是一篇系统领域论文的前3页和最后1页内容（包含摘要、引言和结论）"
-        char_limit = 12000
-    
-    user_prompt = (
-        f"{content_desc}，请按照要求生成深度摘要：\n\n"
-        f"```\n{text_content[:char_limit]}\n```"
-    )
-
-    for attempt in range(max_retries + 1):
-        try:
-            response = client.chat.completions.create(
-                model=config.DEEPSEEK_MODEL,
-                messages=[
-                    {"role": "system", "content": SYSTEM_PROMPT},
-                    {"role": "user", "content": user_prompt},
-                ],
-                temperature=config.TEMPERATURE,
-                max_tokens=config.DEEPSEEK_MAX_TOKENS,
-            )
+            if is_rate_limit or _is_transient_error(e):
+                _cool_down("gemini")
+            yield f"⚠️ Gemini 调用失败: {type(e).__name__}"
+            return
 
-            if not response.choices:
-                logger.warning("[Summarizer/DeepSeek] 返回空候选")
-                return "⚠️ DeepSeek 返回空响应"
+    yield "⚠️ Gemini 重试次数耗尽"
 
-            text = response.choices[0].message.content.strip()
-            if not text:
-                return "⚠️ DeepSeek 返回空文本"
-
-            logger.info("[Summarizer/DeepSeek] 成功生成总结 (%d 字符)", len(text))
-            return text
-
-        except Exception as e:
-            error_str = str(e)
-            # DeepSeek 也会返回 429 / rate_limit_exceeded
-            is_rate_limit = (
-                "429" in error_str 
-                or "rate_limit" in error_str.lower()
-                or "RateLimitError" in str(type(e).__name__)
-            )
-
-            if is_rate_limit and attempt < max_retries:
-                delay = base_delay * (2 ** attempt)
-                logger.warning(
-                    "[Summarizer/DeepSeek] Rate Limit，第 %d/%d 次重试，等待 %ds...",
-                    attempt + 1, max_retries, delay,
-                )
-                time.sleep(delay)
-                continue
 
-            logger.error("[Summarizer/DeepSeek] 调用失败: %s", e, exc_info=True)
-            return f"⚠️ DeepSeek 调用失败: {type(e).__name__}"
+# OpenAI 兼容提供商：名称 → (日志显示名, 客户端获取函数, 模型, 最大输出 token)
+_OPENAI_PROVIDERS = {
+    "deepseek": ("DeepSeek", _get_deepseek_client, config.DEEPSEEK_MODEL, config.DEEPSEEK_MAX_TOKENS),
+    "openai": ("OpenAI", _get_openai_client, config.OPENAI_MODEL, config.OPENAI_MAX_TOKENS),
+}
 
-    return "⚠️ DeepSeek 重试次数耗尽"
 
+def _stream_openai_compatible(provider: str, text_content: str, max_retries: int, base_delay: int) -> Iterator[str]:
+    """使用 OpenAI 兼容接口 (DeepSeek / OpenAI) 流式生成总结（带重试，仅在输出第一个片段前重试）。"""
+    name, get_client, model, max_tokens = _OPENAI_PROVIDERS[provider]
+    tag = f"[Summarizer/{name}]"
+    client = get_client()
 
-def _summarize_with_openai(text_content: str, max_retries: int, base_delay: int) -> str:
-    """使用 OpenAI ChatGPT 生成总结（带重试）。"""
-    client = _get_openai_client()
+    user_prompt = _build_user_prompt(text_content)
 
-    if config.PDF_EXTRACT_MODE == "full":
-        content_desc = "以下是一篇系统领域论文的完整全文内容"
-        char_limit = 30000
-    else:
-        content_desc = "以下是一篇系统领域论文的前3页和最后1页内容（包含摘要、引言和结论）"
-        char_limit = 12000
-
-    user_prompt = (
-        f"{content_desc}，请按照要求生成深度摘要：\n\n"
-        f"```\n{text_content[:char_limit]}\n```"
-    )
+    cache_key = LLMCache.cache_key(model, _SYSTEM_INSTRUCTION, user_prompt, config.TEMPERATURE)
+    cached = _SUMMARY_CACHE.get(cache_key)
+    if cached is not None:
+        logger.info("%s 命中总结缓存 (%d 字符)", tag, len(cached))
+        yield cached
+        return
 
+    _START_LIMITER.wait()
+    deadline = time.monotonic() + config.LLM_RETRY_DEADLINE
     for attempt in range(max_retries + 1):
+        _check_shutdown()
+        stream = _SummaryStream()
         try:
             response = client.chat.completions.create(
-                model=config.OPENAI_MODEL,
-                messages=[
-                    {"role": "system", "content": SYSTEM_PROMPT},
-                    {"role": "user", "content": user_prompt},
-                ],
+                model=model,
+                messages=[_SYSTEM_MESSAGE, {"role": "user", "content": user_prompt}],
                 temperature=config.TEMPERATURE,
-                max_tokens=config.OPENAI_MAX_TOKENS,
+                max_tokens=max_tokens,
+                stream=True,
             )
 
-            # 类型检查：确保返回的是正确的对象
+            # 类型检查：Base URL 配置错误时可能返回字符串而非流对象
             if isinstance(response, str):
-                logger.error("[Summarizer/OpenAI] API 返回了字符串而非对象: %s", response[:200])
-                return f"⚠️ OpenAI API 配置错误，返回: {response[:100]}"
-            
-            if not hasattr(response, 'choices'):
-                logger.error("[Summarizer/OpenAI] 响应对象缺少 choices 属性，类型: %s", type(response))
-                return f"⚠️ OpenAI API 响应格式错误 (类型: {type(response).__name__})"
-
-            if not response.choices:
-                logger.warning("[Summarizer/OpenAI] 返回空候选")
-                return "⚠️ OpenAI 返回空响应"
-
-            text = response.choices[0].message.content
+                logger.error("%s API 返回了字符串而非对象: %s", tag, response[:200])
+                yield f"⚠️ {name} API 配置错误，返回: {response[:100]}"
+                return
+
+            has_choices = False
+            for chunk in response:
+                if not chunk.choices:
+                    continue
+                has_choices = True
+                delta = stream.feed(chunk.choices[0].delta.content or "")
+                if delta:
+                    yield delta
+                if stream.done:
+                    logger.debug("%s 最后一节已结束，提前终止输出", tag)
+                    response.close()
+                    break
+            tail = stream.flush()
+            if tail:
+                yield tail
+
+            if not has_choices:
+                logger.warning("%s 返回空候选", tag)
+                yield f"⚠️ {name} 返回空响应"
+                return
+
+            text = stream.text
             if not text:
-                return "⚠️ OpenAI 返回空文本"
-            
-            text = text.strip()
-            logger.info("[Summarizer/OpenAI] 成功生成总结 (%d 字符)", len(text))
-            return text
+                yield f"⚠️ {name} 返回空文本"
+                return
+
+            logger.info("%s 成功生成总结 (%d 字符)", tag, len(text))
+            _SUMMARY_CACHE.set(cache_key, model, text)
+            return
 
         except AttributeError as e:
-            logger.error(
-                "[Summarizer/OpenAI] 属性访问错误 (可能 API 配置有误): %s, response type: %s",
-                e, type(response).__name__ if 'response' in locals() else 'undefined'
-            )
-            return f"⚠️ OpenAI API 配置错误: {str(e)}"
+            logger.error("%s 属性访问错误 (可能 API 配置有误): %s", tag, e)
+            yield f"⚠️ {name} API 配置错误: {str(e)}"
+            return
         except Exception as e:
-            error_str = str(e)
-            is_rate_limit = "429" in error_str or "rate_limit" in error_str.lower()
+            # 已向调用方输出部分内容时无法在此重试，交给调用方处理
+            if stream.parts:
+                logger.error("%s 输出中断: %s", tag, e, exc_info=True)
+                raise _StreamInterrupted(type(e).__name__) from e
+
+            # DeepSeek 的 429 同样映射为 openai.RateLimitError
+            is_rate_limit = isinstance(e, openai.RateLimitError)
 
             if is_rate_limit and attempt < max_retries:
-                delay = base_delay * (2 ** attempt)
-                logger.warning(
-                    "[Summarizer/OpenAI] Rate Limit，第 %d/%d 次重试，等待 %ds...",
-                    attempt + 1, max_retries, delay,
-                )
-                time.sleep(delay)
-                continue
+                delay = _retry_delay(e, attempt, base_delay)
+                if time.monotonic() + delay <= deadline:
+                    logger.warning(
+                        "%s Rate Limit，第 %d/%d 次重试，等待 %.1fs...",
+                        tag, attempt + 1, max_retries, delay,
+                    )
+                    _sleep(delay)
+                    continue
+                logger.warning("%s 重试等待将超过 LLM_RETRY_DEADLINE，放弃重试", tag)
+
+            logger.error("%s 调用失败: %s", tag, e, exc_info=True)
+            if is_rate_limit or _is_transient_error(e):
+                _cool_down(provider)
+            yield f"⚠️ {name} 调用失败: {type(e).__name__}"
+            return
+
+    yield f"⚠️ {name} 重试次数耗尽"
+
+
+def _shortcut_summary(text_content: str) -> Optional[str]:
+    """无需调用 LLM 的输入 (空文本 / 过短) 直接给出结果，否则返回 None。"""
+    if not text_content or not text_content.strip():
+        return "_无内容可供总结_"
+    if len(text_content.strip()) < config.MIN_SUMMARY_CHARS:
+        logger.info("[Summarizer] 输入过短 (%d 字符)，跳过 LLM 调用", len(text_content.strip()))
+        return _render_short_summary(text_content)
+    return None
+
+
+def _configured_providers() -> list[tuple[str, Callable[..., Iterator[str]]]]:
+    """按 LLM_PROVIDER_CHAIN 顺序返回已知且配置了 API Key 的 (提供商名称, 流式总结函数)。"""
+    providers = []
+    for provider in config.LLM_PROVIDER_CHAIN:
+        stream_fn, api_key = _PROVIDERS.get(provider, (None, None))
+        if stream_fn is None:
+            logger.error("[Summarizer] 未知的 LLM 提供商: %s", provider)
+            continue
+        if api_key():
+            providers.append((provider, stream_fn))
+    return providers
+
+
+def _available_providers() -> list[tuple[str, Callable[..., Iterator[str]]]]:
+    """
+    返回本次应依次尝试的 (提供商名称, 流式总结函数)。
+
+    跳过冷却中的提供商；若全部在冷却，仍返回冷却最早结束的一个，而不是放弃总结。
+    """
+    configured = _configured_providers()
+    ready = [(name, fn) for name, fn in configured if _cooldown_remaining(name) == 0]
+    if ready or not configured:
+        return ready
+    name, fn = min(configured, key=lambda item: _cooldown_remaining(item[0]))
+    logger.info("[Summarizer] 所有提供商均在冷却中，尝试最早恢复的 %s", name)
+    return [(name, fn)]
+
 
-            logger.error("[Summarizer/OpenAI] 调用失败: %s", e, exc_info=True)
-            return f"⚠️ OpenAI 调用失败: {type(e).__name__}"
+def _no_provider_result() -> str:
+    logger.error("[Summarizer] 没有可用的 LLM 提供商: %s", ", ".join(config.LLM_PROVIDER_CHAIN))
+    return f"⚠️ 配置错误: 无可用 LLM 提供商 ({config.LLM_PROVIDER})"
 
-    return "⚠️ OpenAI 重试次数耗尽"
+
+def summarize_stream(text_content: str) -> Iterator[str]:
+    """
+    调用配置的 LLM 提供商对论文文本进行总结，按生成进度逐段产出。
+
+    提供商在输出第一个片段前失败时自动切换到下一个提供商；一旦开始输出，
+    后续片段都来自同一个提供商，中途失败时以 "⚠️ 输出中断" 结尾。
+    失败时产出以 "⚠️" 开头的占位文本。
+
+    Args:
+        text_content: 论文摘要或全文片段。
+
+    Yields:
+        Markdown 格式中文简报的文本片段。
+    """
+    shortcut = _shortcut_summary(text_content)
+    if shortcut is not None:
+        yield shortcut
+        return
+
+    result = None
+    for provider, stream_fn in _available_providers():
+        chunks = stream_fn(text_content, config.LLM_MAX_RETRIES, config.LLM_RETRY_BASE_DELAY)
+        # 错误信息总是作为唯一的片段产出
+        result = next(chunks, "")
+        if result and not result.startswith("⚠️"):
+            if provider != config.LLM_PROVIDER:
+                logger.info("[Summarizer] 已切换到备用提供商 %s 完成总结", provider)
+            yield result
+            try:
+                yield from chunks
+            except _StreamInterrupted as e:
+                # 已产出的片段无法撤回，只能标注中断
+                yield f"\n\n⚠️ 输出中断: {e}"
+            return
+
+    yield _no_provider_result() if result is None else result
 
 
 def summarize(text_content: str) -> str:
     """
-    调用配置的 LLM 提供商对论文文本进行总结。
+    调用配置的 LLM 提供商对论文文本进行总结 (缓冲完整输出后返回)。
+
+    与 summarize_stream 不同，输出中途中断时丢弃不完整的结果，
+    重试一次后切换到下一个提供商，保证返回的总结要么完整、要么以 "⚠️" 开头。
 
     Args:
         text_content: 论文摘要或全文片段。
@@ -340,18 +842,70 @@ def summarize(text_content: str) -> str:
     Returns:
         Markdown 格式的中文简报。失败时返回占位文本。
     """
-    if not text_content or not text_content.strip():
-        return "_无内容可供总结_"
+    shortcut = _shortcut_summary(text_content)
+    if shortcut is not None:
+        return shortcut
+
+    result = None
+    for provider, stream_fn in _available_providers():
+        for attempt in range(2):
+            try:
+                result = "".join(
+                    stream_fn(text_content, config.LLM_MAX_RETRIES, config.LLM_RETRY_BASE_DELAY)
+                ).strip()
+                break
+            except _StreamInterrupted as e:
+                logger.warning("[Summarizer] %s 输出中断 (%s)，丢弃不完整的总结", provider, e)
+                result = f"⚠️ {provider} 输出中断: {e}"
+        if result and not result.startswith("⚠️"):
+            if provider != config.LLM_PROVIDER:
+                logger.info("[Summarizer] 已切换到备用提供商 %s 完成总结", provider)
+            return result
+
+    return _no_provider_result() if result is None else result
+
+
+# 提供商名称 → (流式总结函数, API Key 读取函数)
+_PROVIDERS = {
+    "gemini": (_stream_with_gemini, lambda: config.GEMINI_API_KEY),
+    "deepseek": (functools.partial(_stream_openai_compatible, "deepseek"), lambda: config.DEEPSEEK_API_KEY),
+    "openai": (functools.partial(_stream_openai_compatible, "openai"), lambda: config.OPENAI_API_KEY),
+}
+
+
+def summarize_batch(texts: Iterable[str], max_workers: Optional[int] = None) -> List[str]:
+    """
+    并发总结多段文本，按输入顺序返回结果。
 
-    max_retries = config.LLM_MAX_RETRIES
-    base_delay = config.LLM_RETRY_BASE_DELAY
-
-    if config.LLM_PROVIDER == "gemini":
-        return _summarize_with_gemini(text_content, max_retries, base_delay)
-    elif config.LLM_PROVIDER == "deepseek":
-        return _summarize_with_deepseek(text_content, max_retries, base_delay)
-    elif config.LLM_PROVIDER == "openai":
-        return _summarize_with_openai(text_content, max_retries, base_delay)
-    else:
-        logger.error("[Summarizer] 未知的 LLM_PROVIDER: %s", config.LLM_PROVIDER)
-        return f"⚠️ 配置错误: LLM_PROVIDER={config.LLM_PROVIDER}"
+    texts 可以是惰性迭代器 (例如边提取 PDF 边产出)，每产出一段即提交到线程池；
+    请求起始间隔仍由 REQUEST_SLEEP 限制，并发只让耗时较长的请求相互重叠。
+    被中断时不再发起新请求，但会等待进行中的请求完成并写入缓存后再抛出异常。
+
+    Args:
+        texts: 论文摘要或全文片段序列。
+        max_workers: 最大并发请求数，默认 config.LLM_CONCURRENCY。
+
+    Returns:
+        与输入一一对应的 Markdown 总结列表。
+    """
+    _SHUTDOWN.clear()
+    pool = ThreadPoolExecutor(max_workers=max_workers or config.LLM_CONCURRENCY)
+    try:
+        futures = [pool.submit(summarize, text) for text in texts]
+        pool.shutdown(wait=True)
+    except BaseException:
+        # 被中断 (Ctrl+C / SIGTERM)：取消排队中的任务，正在节流 / 重试等待的任务立即放弃，
+        # 只等待已发出的请求完成，其结果已写入总结缓存，下次运行直接复用
+        logger.warning("[Summarizer] 批量总结被中断，等待进行中的请求完成...")
+        _SHUTDOWN.set()
+        pool.shutdown(wait=True, cancel_futures=True)
+        raise
+
+    results = []
+    for future in futures:
+        try:
+            results.append(future.result())
+        except Exception as e:
+            logger.error("[Summarizer] 总结失败: %s", e, exc_info=True)
+            results.append(f"⚠️ 总结失败: {type(e).__name__}")
+    return results
@@ -0,0 +1,110 @@
+"""LLM 总结缓存模块 - 以 (模型, 提示词, 温度) 的哈希为键，将总结结果持久化到本地 sqlite。
+
+重跑或同一论文再次出现时直接复用已生成的总结，避免重复的 LLM 调用。
+缓存文件位于 config.CACHE_DIR，CI 中由 actions/cache 跨运行保存。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LLMCache:
+    """基于 sqlite 的 LLM 响应精确匹配缓存 (线程安全，连接在首次使用时建立)。"""
+
+    def __init__(self, path: Path, ttl_seconds: float):
+        self._path = Path(path)
+        self._ttl_seconds = ttl_seconds
+        self._conn: Optional[sqlite3.Connection] = None
+        self._disabled = False
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def cache_key(model: str, system_prompt: str, user_prompt: str, temperature: float) -> str:
+        """计算缓存键：请求参数任一变化都会得到不同的键。"""
+        payload = json.dumps(
+            {
+                "model": model,
+                "system": system_prompt,
+                "user": user_prompt,
+                "temperature": temperature,
+            },
+            ensure_ascii=False,
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """打开 (必要时创建) 缓存数据库，失败时禁用缓存。调用方需持有锁。"""
+        if self._conn is not None or self._disabled:
+            return self._conn
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self._path, check_same_thread=False)
+            # WAL：写入不阻塞读取，每次提交只追加日志，进程被杀时已提交的条目不会丢失
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS summaries("
+                "key TEXT PRIMARY KEY, model TEXT, created_at INTEGER, response TEXT)"
+            )
+            # 顺带清理过期条目
+            conn.execute(
+                "DELETE FROM summaries WHERE created_at < ?",
+                (int(time.time() - self._ttl_seconds),),
+            )
+            conn.commit()
+        except (OSError, sqlite3.Error) as e:
+            logger.warning("[LLMCache] 打开缓存失败，本次运行不使用缓存: %s", e)
+            self._disabled = True
+            return None
+        self._conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[str]:
+        """读取未过期的缓存响应，未命中返回 None。"""
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return None
+            try:
+                row = conn.execute(
+                    "SELECT response FROM summaries WHERE key = ? AND created_at >= ?",
+                    (key, int(time.time() - self._ttl_seconds)),
+                ).fetchone()
+            except sqlite3.Error as e:
+                logger.warning("[LLMCache] 读取缓存失败: %s", e)
+                return None
+        return row[0] if row else None
+
+    def set(self, key: str, model: str, response: str) -> None:
+        """写入 (或覆盖) 一条缓存响应。"""
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                with conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO summaries(key, model, created_at, response) "
+                        "VALUES (?, ?, ?, ?)",
+                        (key, model, int(time.time()), response),
+                    )
+            except sqlite3.Error as e:
+                logger.warning("[LLMCache] 写入缓存失败: %s", e)
+
+    def close(self) -> None:
+        """关闭数据库连接。"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
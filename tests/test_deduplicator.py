@@ -0,0 +1,174 @@
+"""Deduplicator 本地 ID 缓存测试
+使用临时 CACHE_DIR 与 mock 的 GraphQL 响应，验证增量同步、全量对账与 flush 长度上限。
+不访问 GitHub。
+"""
+
+import json as jsonlib
+import sqlite3
+import sys
+from pathlib import Path
+from unittest import mock
+
+import pytest
+import requests
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import config
+from src.deduplicator import _ISSUE_BODY_LIMIT, _PAPERS_MARKER, _TRUNCATED_NOTICE, Deduplicator
+from src.sources.base import Paper
+
+
+class _FakeGraphQL:
+    """按 since 过滤 issues 并分页返回，记录每次请求的 variables。"""
+
+    def __init__(self, page_size: int = 2):
+        self.issues: list[dict] = []   # {"number", "title", "body", "updated"}
+        self.calls: list[dict] = []
+        self.error: Exception | None = None
+        self._page_size = page_size
+
+    def add_issue(self, number: int, paper_ids: list[str], updated: str = "2000-01-01T00:00:00Z") -> None:
+        body = "".join(f"- **Paper ID**: `{paper_id}`\n" for paper_id in paper_ids)
+        self.issues.append({"number": number, "title": f"[Daily] #{number}", "body": body, "updated": updated})
+
+    def post(self, url, json=None, timeout=None):
+        variables = dict(json["variables"])
+        self.calls.append(variables)
+        if self.error is not None:
+            raise self.error
+        since = variables["since"]
+        matched = [i for i in self.issues if since is None or i["updated"] >= since]
+        start = int(variables["cursor"] or 0)
+        page = matched[start:start + self._page_size]
+        has_next = start + self._page_size < len(matched)
+        resp = mock.Mock(status_code=200, headers={})
+        payload = {"data": {"repository": {"issues": {
+            "nodes": [{k: i[k] for k in ("number", "title", "body")} for i in page],
+            "pageInfo": {"hasNextPage": has_next, "endCursor": str(start + self._page_size)},
+        }}}}
+        resp.json.return_value = payload
+        resp.content = jsonlib.dumps(payload).encode()
+        return resp
+
+
+@pytest.fixture
+def graphql(tmp_path):
+    fake = _FakeGraphQL()
+    with mock.patch.object(config, "CACHE_DIR", str(tmp_path)), \
+            mock.patch.object(config, "GITHUB_TOKEN", "token"), \
+            mock.patch.object(config, "GITHUB_REPOSITORY", "owner/repo"), \
+            mock.patch.object(requests.Session, "post", lambda self, *args, **kwargs: fake.post(*args, **kwargs)):
+        yield fake
+
+
+def _db_rows(query: str) -> list[tuple]:
+    conn = sqlite3.connect(Path(config.CACHE_DIR) / config.PROCESSED_DB_FILE)
+    try:
+        return list(conn.execute(query))
+    finally:
+        conn.close()
+
+
+def test_incremental_sync(graphql):
+    """首次运行全量拉取 (分页)，之后只拉取上次同步后更新过的 Issue 并与缓存合并。"""
+    graphql.add_issue(1, ["a1", "a2"])
+    graphql.add_issue(2, ["b1"])
+    graphql.add_issue(3, ["c1"])
+
+    first = Deduplicator()
+    assert first.processed_ids == {"a1", "a2", "b1", "c1"}
+    assert [call["since"] for call in graphql.calls] == [None, None]   # 3 个 Issue，每页 2 个
+
+    synced_at = dict(_db_rows("SELECT key, value FROM meta"))["synced_at"]
+    graphql.calls.clear()
+    graphql.add_issue(4, ["d1"], updated="2999-01-01T00:00:00Z")
+
+    second = Deduplicator()
+    assert second.processed_ids == {"a1", "a2", "b1", "c1", "d1"}
+    assert [call["since"] for call in graphql.calls] == [synced_at]
+    assert ("d1", 4) in _db_rows("SELECT paper_id, issue FROM papers")
+
+
+def test_full_resync_clears_stale_ids(graphql):
+    """距上次全量同步超过 PROCESSED_RESYNC_DAYS 时重新全量拉取，并清除 GitHub 上已不存在的 ID。"""
+    graphql.add_issue(1, ["a1", "stale"])
+    assert Deduplicator().processed_ids == {"a1", "stale"}
+
+    graphql.issues[0]["body"] = "- **Paper ID**: `a1`\n"
+    conn = sqlite3.connect(Path(config.CACHE_DIR) / config.PROCESSED_DB_FILE)
+    with conn:
+        conn.execute("UPDATE meta SET value = '2000-01-01T00:00:00Z' WHERE key = 'full_synced_at'")
+    conn.close()
+    graphql.calls.clear()
+
+    assert Deduplicator().processed_ids == {"a1"}
+    assert [call["since"] for call in graphql.calls] == [None]
+    assert _db_rows("SELECT paper_id FROM papers") == [("a1",)]
+
+
+def test_fetch_failure_keeps_cache(graphql):
+    """GraphQL 拉取失败时沿用本地缓存，且不推进同步时间。"""
+    graphql.add_issue(1, ["a1"])
+    Deduplicator().processed_ids
+    meta = _db_rows("SELECT key, value FROM meta")
+
+    graphql.error = requests.ConnectionError("offline")
+    assert Deduplicator().processed_ids == {"a1"}
+    assert _db_rows("SELECT key, value FROM meta") == meta
+
+
+def _paper(paper_id: str) -> Paper:
+    return Paper(paper_id=paper_id, title=f"Paper {paper_id}", abstract="abstract", source="arxiv")
+
+
+def test_flush_caps_body_and_persists_written_ids(graphql):
+    """超出 Issue 长度上限时整段丢弃放不下的论文，只持久化实际写入的 paper_id。"""
+    dedup = Deduplicator()
+    dedup.processed_ids
+    issue = mock.Mock(number=7, body=_PAPERS_MARKER + "x" * (_ISSUE_BODY_LIMIT - 9000))
+    dedup._set_today_issue(issue)
+
+    for i in range(4):
+        dedup.append_paper(_paper(f"p{i}"), "总结" * 1500, index=i + 1)   # 每篇约 3000+ 字符
+
+    assert dedup.flush()
+    body = issue.edit.call_args.kwargs["body"]
+    assert body.endswith(_TRUNCATED_NOTICE)
+    assert len(body) <= _ISSUE_BODY_LIMIT + len(_TRUNCATED_NOTICE)
+
+    written = [paper_id for paper_id in ("p0", "p1", "p2", "p3") if f"`{paper_id}`" in body]
+    assert written and dedup.dropped_ids
+    assert written + dedup.dropped_ids == ["p0", "p1", "p2", "p3"]
+    assert sorted(_db_rows("SELECT paper_id FROM papers")) == [(paper_id,) for paper_id in written]
+    assert not dedup.processed_ids & set(dedup.dropped_ids)
+
+
+def test_flush_without_truncation(graphql):
+    """未超出上限时全部写入并持久化。"""
+    dedup = Deduplicator()
+    dedup.processed_ids
+    issue = mock.Mock(number=7, body=_PAPERS_MARKER)
+    dedup._set_today_issue(issue)
+    dedup.append_paper(_paper("p0"), "总结", index=1)
+
+    assert dedup.flush()
+    assert _TRUNCATED_NOTICE not in issue.edit.call_args.kwargs["body"]
+    assert _db_rows("SELECT paper_id, issue FROM papers") == [("p0", 7)]
+    assert dedup.dropped_ids == []
+
+
+@pytest.mark.parametrize("graphql_ok", [True, False])
+def test_rest_lookup_only_when_graphql_fails(graphql, graphql_ok):
+    """GraphQL 拉取成功时今日 Issue 只查索引；失败时才通过 REST 列出今日 Issue。"""
+    if not graphql_ok:
+        graphql.error = requests.ConnectionError("offline")
+    dedup = Deduplicator()
+    dedup._repo = mock.Mock()
+    dedup._repo.get_issues.return_value = []
+    dedup._repo.create_issue.return_value = mock.Mock(number=9, body=_PAPERS_MARKER)
+
+    assert dedup._get_or_create_daily_issue().number == 9
+    assert dedup._repo.get_issues.called is not graphql_ok
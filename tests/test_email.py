@@ -1,10 +1,16 @@
 """QQ 邮箱发送测试脚本
 快速验证您的 QQ 邮箱配置是否正确。
+
+默认使用 mock 替换 SMTP 连接 (不发送真实邮件，可在 CI 中运行)；
+加 --live 参数时才真正发送: python tests/test_email.py --live
 """
 
+import contextlib
 import logging
 import sys
+import tempfile
 from pathlib import Path
+from unittest import mock
 
 # 添加项目根目录到路径
 project_root = Path(__file__).parent.parent
@@ -25,11 +31,33 @@ except ImportError as e:
     logger.error("请先安装依赖: pip install -r requirements.txt")
     sys.exit(1)
 
+# 是否真正连接 SMTP 服务器发送邮件
+LIVE = "--live" in sys.argv
+
+
+def _offline_patches() -> contextlib.ExitStack:
+    """用 mock 替换 smtplib.SMTP_SSL，并为未配置的邮箱参数填入占位值。"""
+    stack = contextlib.ExitStack()
+    stack.enter_context(mock.patch.object(config, "EMAIL_ENABLED", True))
+    stack.enter_context(mock.patch.object(config, "QQ_MAIL_USER", config.QQ_MAIL_USER or "sender@qq.com"))
+    stack.enter_context(mock.patch.object(config, "QQ_MAIL_AUTH_CODE", config.QQ_MAIL_AUTH_CODE or "auth-code"))
+    stack.enter_context(mock.patch.object(config, "QQ_MAIL_TO", config.QQ_MAIL_TO or "recipient@example.com"))
+    stack.enter_context(mock.patch("smtplib.SMTP_SSL"))
+    return stack
+
+
+def test_gmail_config(tmp_path):
+    """测试 QQ 邮箱配置 (未指定 --live 时不发送真实邮件)。"""
+    # 渲染出的 HTML 缓存写到临时目录，不污染项目的 .cache
+    with mock.patch.object(config, "CACHE_DIR", str(tmp_path)), \
+            (contextlib.nullcontext() if LIVE else _offline_patches()):
+        assert check_gmail_config()
+
 
-def test_gmail_config():
+def check_gmail_config() -> bool:
     """测试 QQ 邮箱配置。"""
     logger.info("=" * 60)
-    logger.info("QQ 邮箱配置测试")
+    logger.info("QQ 邮箱配置测试%s", "" if LIVE else " (mock 模式，加 --live 真正发送)")
     logger.info("=" * 60)
     
     # 1. 检查配置
@@ -126,5 +154,8 @@ def test_gmail_config():
 
 
 if __name__ == "__main__":
-    success = test_gmail_config()
+    with tempfile.TemporaryDirectory() as tmp, \
+            mock.patch.object(config, "CACHE_DIR", tmp), \
+            (contextlib.nullcontext() if LIVE else _offline_patches()):
+        success = check_gmail_config()
     sys.exit(0 if success else 1)
@@ -1,10 +1,17 @@
 """OpenAI API 配置测试脚本
 快速验证您的 OPENAI_API_KEY 和 OPENAI_BASE_URL 是否配置正确。
+
+默认使用 mock 替换 API 调用 (不消耗额度，可在 CI 中运行)；
+加 --live 参数时才真正请求 OpenAI: python tests/test_openai.py --live
 """
 
+import contextlib
 import logging
 import sys
+import tempfile
+import types
 from pathlib import Path
+from unittest import mock
 
 # 添加项目根目录到路径
 project_root = Path(__file__).parent.parent
@@ -18,17 +25,111 @@ logger = logging.getLogger(__name__)
 
 try:
     import config
+    import openai
     from openai import OpenAI
+    from src import summarizer
+    from src.summary_cache import LLMCache
 except ImportError as e:
     logger.error("导入失败: %s", e)
     logger.error("请先安装依赖: pip install -r requirements.txt")
     sys.exit(1)
 
+# 是否真正调用 OpenAI API
+LIVE = "--live" in sys.argv
+
+
+def _offline_patches() -> contextlib.ExitStack:
+    """用 mock 替换 chat.completions.create，并为未配置的 API Key 填入占位值。"""
+    stack = contextlib.ExitStack()
+    stack.enter_context(mock.patch.object(config, "OPENAI_API_KEY", config.OPENAI_API_KEY or "sk-test"))
+    stack.enter_context(mock.patch(
+        "openai.resources.chat.completions.Completions.create",
+        return_value=types.SimpleNamespace(
+            choices=[types.SimpleNamespace(message=types.SimpleNamespace(content="你好，这是一个测试回复。"))],
+            usage=types.SimpleNamespace(prompt_tokens=10, completion_tokens=8, total_tokens=18),
+        ),
+    ))
+    return stack
+
+
+# mock 流式输出：最后一节之后的多余章节应被截断
+_STREAM_BODY = (
+    "## 📌 核心问题\n"
+    "测试论文解决了分布式存储中的尾延迟问题。\n\n"
+    "## 💬 落地一句话点评\n"
+    "值得一读。\n"
+    "---\n"
+    "多余的总结内容"
+)
+_EXPECTED_SUMMARY = _STREAM_BODY.split("\n---")[0]
+_PAPER_TEXT = "This paper studies tail latency in distributed storage systems. " * 10
+
+
+def _fake_stream(text: str, chunk_size: int = 5) -> list:
+    """把 text 切成若干 chunk，模拟 create(stream=True) 的返回值。"""
+    class _Stream(list):
+        def close(self):
+            pass
+
+    return _Stream(
+        types.SimpleNamespace(choices=[types.SimpleNamespace(
+            delta=types.SimpleNamespace(content=text[i:i + chunk_size]),
+        )])
+        for i in range(0, len(text), chunk_size)
+    )
+
+
+def _summarizer_patches(cache_dir: Path, create: mock.Mock) -> contextlib.ExitStack:
+    """以 DeepSeek → OpenAI 的顺序调用 summarize，替换 create / 总结缓存 / 请求节流。"""
+    stack = contextlib.ExitStack()
+    stack.enter_context(mock.patch.object(config, "LLM_PROVIDER", "deepseek"))
+    stack.enter_context(mock.patch.object(config, "LLM_PROVIDER_CHAIN", ("deepseek", "openai")))
+    stack.enter_context(mock.patch.object(config, "DEEPSEEK_API_KEY", "sk-deepseek"))
+    stack.enter_context(mock.patch.object(config, "OPENAI_API_KEY", "sk-test"))
+    cache = LLMCache(cache_dir / "summaries.sqlite", ttl_seconds=3600)
+    stack.callback(cache.close)
+    stack.enter_context(mock.patch.object(summarizer, "_SUMMARY_CACHE", cache))
+    stack.enter_context(mock.patch.object(summarizer, "_START_LIMITER", summarizer._StartLimiter(0)))
+    stack.enter_context(mock.patch.dict(summarizer._provider_cooldowns, clear=True))
+    stack.enter_context(mock.patch("openai.resources.chat.completions.Completions.create", create))
+    # 客户端单例按 API Key 创建，前后都丢弃
+    summarizer._reset_clients()
+    stack.callback(summarizer._reset_clients)
+    return stack
+
 
 def test_openai_config():
+    """测试 OpenAI API 配置 (未指定 --live 时不发起网络请求)。"""
+    with contextlib.nullcontext() if LIVE else _offline_patches():
+        assert check_openai_config()
+
+
+def test_summarize_stream_parsing(tmp_path):
+    """summarize 拼接流式片段，并截断最后一节之后的多余内容。"""
+    create = mock.Mock(return_value=_fake_stream(_STREAM_BODY))
+    with _summarizer_patches(tmp_path, create):
+        assert summarizer.summarize(_PAPER_TEXT) == _EXPECTED_SUMMARY
+    assert create.call_count == 1
+    assert create.call_args.kwargs["stream"] is True
+
+
+def test_summarize_failover(tmp_path):
+    """主提供商连接失败时切换到备用提供商，并让主提供商进入冷却。"""
+    create = mock.Mock(side_effect=[
+        openai.APIConnectionError(request=mock.Mock()),
+        _fake_stream(_STREAM_BODY),
+    ])
+    with _summarizer_patches(tmp_path, create):
+        assert summarizer.summarize(_PAPER_TEXT) == _EXPECTED_SUMMARY
+        assert summarizer._cooldown_remaining("deepseek") > 0
+    models = [call.kwargs["model"] for call in create.call_args_list]
+    assert models == [summarizer._OPENAI_PROVIDERS[name][2] for name in ("deepseek", "openai")]
+
+
+def check_openai_config() -> bool:
     """测试 OpenAI API 配置。"""
     logger.info("=" * 60)
-    logger.info("OpenAI API 配置测试")
+    logger.info("OpenAI API 配置测试%s", "" if LIVE else " (mock 模式，加 --live 真正调用 API)")
     logger.info("=" * 60)
     
     # 1. 检查配置
@@ -118,5 +219,11 @@ def test_openai_config():
 
 
 if __name__ == "__main__":
-    success = test_openai_config()
+    with contextlib.nullcontext() if LIVE else _offline_patches():
+        success = check_openai_config()
+    if success and not LIVE:
+        for test in (test_summarize_stream_parsing, test_summarize_failover):
+            with tempfile.TemporaryDirectory() as tmp:
+                test(Path(tmp))
+        logger.info("✓ summarize 流式解析 / 提供商切换测试通过 (mock)")
     sys.exit(0 if success else 1)
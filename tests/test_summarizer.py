@@ -0,0 +1,117 @@
+"""流式总结解析测试
+验证 _SummaryStream 按任意方式切分的增量片段都能得到相同的总结，
+以及 summarize 在输出中途中断时的重试 / 切换逻辑。不发起网络请求。
+"""
+
+import sys
+from pathlib import Path
+from unittest import mock
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import config
+from src import summarizer
+from src.summarizer import _CLOSING_SECTION, _StreamInterrupted, _SummaryStream
+
+_BODY = (
+    "## 📌 核心问题\n"
+    "测试论文解决了分布式存储中的尾延迟问题。\n\n"
+    + _CLOSING_SECTION + "\n"
+    "值得一读。\n"
+)
+_PAPER_TEXT = "This paper studies tail latency in distributed storage systems. " * 10
+
+
+def _feed_all(chunks: list[str]) -> tuple[_SummaryStream, str]:
+    """依次喂入 chunks，返回解析器与转发给调用方的全部文本。"""
+    stream = _SummaryStream()
+    out = []
+    for chunk in chunks:
+        out.append(stream.feed(chunk))
+        if stream.done:
+            break
+    out.append(stream.flush())
+    return stream, "".join(out)
+
+
+def _split(text: str, size: int) -> list[str]:
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def test_closing_section_split_across_chunks():
+    """最后一节标题被拆到多个片段中时仍能识别，并截断其后的多余章节。"""
+    text = _BODY + "---\n多余内容"
+    idx = text.index(_CLOSING_SECTION)
+    for cut in range(idx + 1, idx + len(_CLOSING_SECTION)):
+        stream, out = _feed_all([text[:cut], text[cut:]])
+        assert stream.done
+        assert out.strip() == _BODY.strip()
+        assert stream.text == _BODY.strip()
+
+
+def test_trailing_section_not_leaked():
+    """逐字符输出时，多余章节的开头 ("\\n-" / "\\n#") 不会被提前转发。"""
+    for trailing in ("---\n多余内容", "## 附录\n多余内容"):
+        stream, out = _feed_all(_split(_BODY + trailing, 1))
+        assert stream.done
+        assert out.strip() == _BODY.strip()
+        assert not any("多余" in part or part.endswith("-") for part in stream.parts)
+
+
+def test_stream_ends_early():
+    """未出现最后一节就结束的流，flush 后保留全部已输出内容。"""
+    partial = _BODY[:_BODY.index(_CLOSING_SECTION) + 3]
+    stream, out = _feed_all(_split(partial, 4))
+    assert not stream.done
+    assert out == partial.lstrip()
+    assert stream.text == partial.strip()
+
+
+def test_stream_closes_after_last_section():
+    """最后一节之后直接结束 (无多余章节、末行无换行)，flush 转发缓冲中的最后一行。"""
+    text = _BODY.rstrip("\n")
+    stream, out = _feed_all(_split(text, 3))
+    assert not stream.done
+    assert out == text
+    assert stream.text == text
+
+
+def _summarize_with(*stream_fns):
+    """依次以 stream_fns 作为各提供商的流式函数调用 summarize。"""
+    providers = [(f"p{i}", fn) for i, fn in enumerate(stream_fns)]
+    with mock.patch.object(summarizer, "_available_providers", return_value=providers), \
+            mock.patch.object(config, "LLM_PROVIDER", "p0"):
+        return summarizer.summarize(_PAPER_TEXT)
+
+
+def _interrupted(*args):
+    yield "## 📌 核心问题\n"
+    raise _StreamInterrupted("ReadTimeout")
+
+
+def test_summarize_retries_interrupted_stream():
+    """输出中途中断时丢弃不完整的结果并重试一次。"""
+    primary = mock.Mock(side_effect=[_interrupted(), iter(_split(_BODY, 5))])
+    fallback = mock.Mock()
+    assert _summarize_with(primary, fallback) == _BODY.strip()
+    assert primary.call_count == 2
+    fallback.assert_not_called()
+
+
+def test_summarize_fails_over_after_second_interruption():
+    """重试后仍中断时切换到下一个提供商。"""
+    primary = mock.Mock(side_effect=[_interrupted(), _interrupted()])
+    fallback = mock.Mock(return_value=iter([_BODY]))
+    assert _summarize_with(primary, fallback) == _BODY.strip()
+    assert primary.call_count == 2
+    fallback.assert_called_once()
+
+
+def test_summarize_reports_interruption():
+    """所有提供商都中断时返回以 "⚠️" 开头的结果，而不是不完整的总结。"""
+    primary = mock.Mock(side_effect=lambda *args: _interrupted())
+    result = _summarize_with(primary)
+    assert result.startswith("⚠️")
+    assert "ReadTimeout" in result